@@ -2,10 +2,20 @@
 Cavern - Refactored PyGame Zero Bubble Bobble Clone
 Main entry point that delegates to App (Task A requirement)
 """
+import sys
+
+# Opt-in startup profiling: python main.py --profile-startup
+# Times every module imported until the first frame, then prints a report
+STARTUP_PROFILER = None
+if "--profile-startup" in sys.argv:
+    from src.startup import ImportProfiler
+    STARTUP_PROFILER = ImportProfiler().install()
+
+import atexit
 import pygame
 import pgzero
 import pgzrun
-import sys
+import time
 
 # Check Python version
 if sys.version_info < (3,5):
@@ -23,8 +33,43 @@ WIDTH = 800
 HEIGHT = 480
 TITLE = "Cavern"
 
-# Import app after constants are set
+# Opt-in profiling: python main.py --profile [PATH]
+# F3 toggles the timing overlay; timings are written to PATH on exit
+PROFILE_PATH = None
+if "--profile" in sys.argv:
+    index = sys.argv.index("--profile")
+    if index + 1 < len(sys.argv) and not sys.argv[index + 1].startswith("-"):
+        PROFILE_PATH = sys.argv[index + 1]
+    else:
+        PROFILE_PATH = "profile.json"
+
+# Opt-in input recording: python main.py --record PATH
+# Replay with python -m src.replay PATH
+RECORD_PATH = None
+if "--record" in sys.argv:
+    index = sys.argv.index("--record")
+    RECORD_PATH = sys.argv[index + 1] if index + 1 < len(sys.argv) else "session.rec"
+
+# Opt-in level pack: python main.py --levels PATH (text or compiled)
+LEVELS_PATH = None
+if "--levels" in sys.argv:
+    index = sys.argv.index("--levels")
+    if index + 1 < len(sys.argv):
+        LEVELS_PATH = sys.argv[index + 1]
+
+# Opt-in dirty-rect rendering: python main.py --dirty-rects
+# Only the parts of each frame that changed are redrawn and presented
+DIRTY_RECTS = "--dirty-rects" in sys.argv
+
+# Input comes from key events, so taps between frames aren't lost; the
+# keyboard is polled once per frame instead with python main.py --poll-input
+POLL_INPUT = "--poll-input" in sys.argv
+
+# Import app after constants are set. The profiler and recorder are only
+# imported when their options are given.
 from src.app import App
+from src.input import EventInputManager, InputManager
+from src.levelpack import load_pack
 from src.screens.menu import MenuScreen
 
 # Global app instance
@@ -33,27 +78,70 @@ app = None
 def init_app():
     """Initialize the app with required Pygame Zero objects."""
     global app
-    app = App(screen, keyboard, sounds)
+    profiler = None
+    if PROFILE_PATH:
+        from src.profiler import Profiler
+        profiler = Profiler()
+        profiler.instrument_moves()
+        atexit.register(profiler.dump, PROFILE_PATH)
+    recorder = None
+    if RECORD_PATH:
+        from src.replay import Recorder
+        recorder = Recorder(RECORD_PATH)
+        atexit.register(recorder.save)
+    level_pack = None
+    if LEVELS_PATH:
+        level_pack = load_pack(LEVELS_PATH)
+    presenter = None
+    if DIRTY_RECTS:
+        # Pygame Zero flips the whole display after every draw; the
+        # presenter's flip presents just the rects the app changed
+        from src.render.dirty import DirtyPresenter
+        presenter = DirtyPresenter().install()
+        atexit.register(presenter.remove)
+    app = App(screen, keyboard, sounds, music=music, profiler=profiler, recorder=recorder, level_pack=level_pack,
+              dirty_rects=DIRTY_RECTS, input_manager=InputManager() if POLL_INPUT else EventInputManager(),
+              presenter=presenter)
     app.change_screen(MenuScreen(app))
 
 # Pygame Zero callbacks - THIN DELEGATES (Task A requirement)
-def update():
+def update(dt):
     """Global update - thin delegate to app.update()"""
     if app is None:
         init_app()
-    app.update()
+    app.update(dt)
 
 def draw():
     """Global draw - thin delegate to app.draw()"""
     if app:
         app.draw()
+        if STARTUP_PROFILER and app.first_frame_seconds is not None:
+            report_startup()
+
+def on_key_down(key):
+    """Key press - thin delegate to the app's input manager"""
+    if app:
+        app.input_manager.key_down(key)
+
+def on_key_up(key):
+    """Key release - thin delegate to the app's input manager"""
+    if app:
+        app.input_manager.key_up(key)
+
+def report_startup():
+    """Print the startup import profile once the first frame is drawn."""
+    global STARTUP_PROFILER
+    STARTUP_PROFILER.remove()
+    elapsed = time.perf_counter() - STARTUP_PROFILER.started
+    print(f"First frame drawn {elapsed * 1000:.0f} ms after startup")
+    STARTUP_PROFILER.report()
+    STARTUP_PROFILER = None
 
-# Set up sound system
+# Set up sound system; the app's SoundBank starts the music once it is
+# loading sounds in the background
 try:
     pygame.mixer.quit()
     pygame.mixer.init(44100, -16, 2, 1024)
-    music.play("theme")
-    music.set_volume(0.3)
 except:
     pass
 
@@ -1,23 +1,104 @@
 """App class managing screen transitions."""
+import time
+
+import pygame
+
+from src.audio import SoundBank
+from src.entities.draw_utils import status_surface
+from src.entities.player import Player
+from src.game import Game
 from src.input import InputManager
+from src.render.dirty import DirtyRectQueue
+from src.render.game_renderer import GameRenderer
+from src.render.queue import RenderQueue
 
 
 class App:
-    """Application manager handling screen state and transitions."""
+    """Application manager handling screen state and transitions.
+    
+    The simulation runs on a fixed timestep: each Pygame Zero frame adds its
+    elapsed time to an accumulator and runs as many ticks as fit, up to
+    max_catch_up. When the machine can't keep up, draws are skipped (at
+    most max_skipped_draws in a row) to give the time to the simulation.
+    """
+    
+    TICK_RATE = 60
+    MAX_CATCH_UP = 4
+    MAX_SKIPPED_DRAWS = 3
     
-    def __init__(self, screen, keyboard, sounds):
+    def __init__(self, screen, keyboard, sounds, music=None, tick_rate=TICK_RATE,
+                 max_catch_up=MAX_CATCH_UP, max_skipped_draws=MAX_SKIPPED_DRAWS,
+                 profiler=None, recorder=None, level_pack=None, dirty_rects=False, input_manager=None,
+                 presenter=None):
         """Initialize the app.
         
         Args:
             screen: Pygame Zero screen object
             keyboard: Pygame Zero keyboard object
-            sounds: Pygame Zero sounds object
+            sounds: Pygame Zero sounds object, played through a SoundBank
+                that loads them on a worker thread
+            music: Optional Pygame Zero music object; the SoundBank's loader
+                starts the theme on it
+            tick_rate: Simulation ticks per second
+            max_catch_up: Most ticks run in one frame when behind
+            max_skipped_draws: Most consecutive draws skipped when behind
+            profiler: Optional Profiler timing updates and draws; F3 toggles
+                its overlay
+            recorder: Optional Recorder capturing each game played
+            level_pack: LevelPack to play; the shipped levels if None
+            dirty_rects: Redraw and present only the parts of each frame
+                that changed
+            input_manager: Source of each frame's InputState, such as an
+                EventInputManager fed by key events; an InputManager polling
+                keyboard if None
+            presenter: Installed DirtyPresenter to hand the dirty rects to,
+                for Pygame Zero's flip to present; the app presents them
+                itself with pygame.display.update if None
         """
+        self._created = time.perf_counter()
         self.screen = screen
         self.keyboard = keyboard
-        self.sounds = sounds
+        self.sounds = SoundBank(sounds, music=music, background=True) if sounds else None
         self.current_screen = None
-        self.input_manager = InputManager()
+        self.input_manager = input_manager or InputManager()
+        self.profiler = profiler
+        self.recorder = recorder
+        self.level_pack = level_pack
+        self.renderer = GameRenderer(profiler)
+        self.dirty_rects = dirty_rects
+        self.render_queue = DirtyRectQueue() if dirty_rects else RenderQueue()
+        self.presenter = presenter
+        self._surface = None
+        
+        # Games reused across screens rather than rebuilt: the menu's
+        # background, and the next game to play, prepared while the menu shows
+        self.menu_game = Game(player=None, sounds=self.sounds, profiler=profiler, level_pack=level_pack)
+        self.play_game = Game(player=Player(), sounds=self.sounds, profiler=profiler,
+                              level_pack=level_pack)
+        self._play_prepared = False
+        
+        # Time from creating the app to drawing its first frame, and from
+        # the frame a screen change was asked for to its first draw
+        self.first_frame_seconds = None
+        self.transition_times = {}
+        self._frame_start = None
+        self._transition = None
+        
+        # Fixed timestep state
+        self.tick_time = 1.0 / tick_rate
+        self.max_catch_up = max_catch_up
+        self.max_skipped_draws = max_skipped_draws
+        self._accumulator = 0.0
+        self._pending_input = None
+        self._skip_draw = False
+        self._skipped_draws = 0
+        
+        # Measured rates, refreshed about once a second
+        self.sim_rate = 0.0
+        self.render_rate = 0.0
+        self._rate_start = time.perf_counter()
+        self._rate_ticks = 0
+        self._rate_draws = 0
     
     def change_screen(self, new_screen):
         """Change to a new screen.
@@ -25,16 +106,136 @@ class App:
         Args:
             new_screen: Screen object to switch to
         """
+        if self._frame_start is not None:
+            self._transition = (type(new_screen).__name__, self._frame_start)
         self.current_screen = new_screen
         self.current_screen.on_enter()
+        if self.dirty_rects:
+            self.render_queue.invalidate()
     
-    def update(self):
-        """Update the current screen."""
-        if self.current_screen:
-            input_state = self.input_manager.capture_input(self.keyboard)
+    def prepare_play(self):
+        """Get play_game ready for a new session, unless it already is.
+        
+        The menu calls this while it is showing, so that starting a game is
+        only a screen swap: the game is reset with a new seed, and its first
+        level and status bar are rendered.
+        """
+        if not self._play_prepared:
+            game = self.play_game
+            game.reset()
+            self.renderer.prepare(game)
+            status_surface(game.player, game.level)
+            self._play_prepared = True
+    
+    def start_play(self):
+        """The game for a starting PlayScreen, prepared now if the menu didn't."""
+        self.prepare_play()
+        self._play_prepared = False
+        return self.play_game
+    
+    def update(self, dt=None):
+        """Run the simulation ticks due for this frame.
+        
+        Args:
+            dt: Seconds since the last frame; one tick's worth if omitted
+        """
+        if not self.current_screen:
+            return
+        if dt is None:
+            dt = self.tick_time
+        prof = self.profiler
+        start = self._frame_start = time.perf_counter()
+        
+        # Edges captured on frames that run no tick are held for the next one
+        input_state = self.input_manager.capture_input(self.keyboard)
+        if prof and input_state.overlay_pressed:
+            prof.toggle_overlay()
+        if self._pending_input is not None:
+            input_state = self._pending_input.merged_with(input_state)
+        
+        self._accumulator += dt
+        ticks = 0
+        while self._accumulator >= self.tick_time and ticks < self.max_catch_up:
             self.current_screen.update(input_state)
+            if ticks == 0:
+                self.input_manager.consumed(time.perf_counter(), prof)
+            input_state = input_state.without_edges()
+            self._accumulator -= self.tick_time
+            ticks += 1
+            if self.sounds:
+                self.sounds.end_tick(prof)
+            if prof:
+                prof.end_tick()
+        self._pending_input = input_state
+        
+        # Still behind after catching up: skip drawing this frame, and drop
+        # whatever backlog is beyond one frame's catch-up budget
+        behind = self._accumulator >= self.tick_time
+        self._accumulator = min(self._accumulator, self.max_catch_up * self.tick_time)
+        self._skip_draw = behind and self._skipped_draws < self.max_skipped_draws
+        
+        self._rate_ticks += ticks
+        self._update_rates()
+        
+        if prof:
+            prof.lap("app.update", start)
     
     def draw(self):
-        """Draw the current screen."""
+        """Draw the current screen.
+        
+        Screens queue their sprites on render_queue, which is submitted to
+        the display in one batch. In dirty-rect mode only the changed parts
+        are drawn, and only those are presented.
+        """
+        if self._skip_draw:
+            self._skipped_draws += 1
+            return
+        self._skipped_draws = 0
         if self.current_screen:
+            prof = self.profiler
+            if prof:
+                start = time.perf_counter()
             self.current_screen.draw()
+            if prof:
+                prof.draw_overlay(self.render_queue)
+            surface = self.screen.surface
+            if self.dirty_rects and surface is not self._surface:
+                # A new display surface holds none of the last frame
+                self.render_queue.invalidate()
+                self._surface = surface
+            dirty = self.render_queue.flush(surface)
+            if self.dirty_rects:
+                if self.presenter:
+                    self.presenter.present(dirty)
+                elif dirty:
+                    pygame.display.update(dirty)
+                if prof:
+                    prof.record_count("dirty_rects", len(dirty))
+                    prof.record_count("dirty_pixels", self.render_queue.dirty_pixels)
+            self._rate_draws += 1
+            if self.first_frame_seconds is None:
+                self.first_frame_seconds = time.perf_counter() - self._created
+                if prof:
+                    prof.record("app.first_frame", self.first_frame_seconds)
+            if self._transition:
+                self._end_transition(prof)
+            if prof:
+                prof.lap("app.draw", start)
+    
+    def _end_transition(self, prof):
+        name, started = self._transition
+        self._transition = None
+        elapsed = time.perf_counter() - started
+        self.transition_times[name] = elapsed
+        if prof:
+            prof.record("transition." + name, elapsed)
+    
+    def _update_rates(self):
+        now = time.perf_counter()
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self.sim_rate = self._rate_ticks / elapsed
+            self.render_rate = self._rate_draws / elapsed
+            self._rate_start = now
+            self._rate_ticks = 0
+            self._rate_draws = 0
@@ -0,0 +1,245 @@
+"""Sound effects through a fixed pool of mixer channels.
+
+Every variant of every sound in sounds/ is decoded once, up front, so
+playing a sound is a dict lookup rather than a loader call. The decoding
+can run on a worker thread, which also starts the theme music, so the menu
+appears without waiting for it. Until a sound has loaded, playing it is
+skipped and counted rather than blocking the game to decode it.
+
+Playback is limited three ways, so a burst of orbs popping on one frame
+can't flood the mixer:
+- a sound already started this tick is not started again
+- each sound has a cap on its simultaneous voices; past the cap, its
+  oldest voice is cut off and reused
+- the pool has a fixed number of channels; when all are busy, the oldest
+  voice is cut off and reused
+
+Drops, steals and skips are counted, both in total and per tick for the
+profiler.
+
+Usage (blocking time of loading up front and on a worker thread):
+    python -m src.audio
+"""
+import os
+import random
+import re
+import threading
+import time
+
+import pygame
+
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sounds")
+
+# Sound files are named <sound><variant>.ogg, e.g. pop0.ogg to pop3.ogg
+VARIANT_FILE = re.compile(r"([a-z_]+)(\d+)\.ogg$")
+
+
+def sound_variants(directory=SOUNDS_DIR):
+    """Names of each sound's variant files, without extension.
+    
+    Returns:
+        Dict of sound name to a list of variant names, in variant order
+    """
+    found = {}
+    for filename in os.listdir(directory):
+        match = VARIANT_FILE.match(filename)
+        if match:
+            found.setdefault(match.group(1), []).append((int(match.group(2)), filename[:-4]))
+    return {name: [variant for _, variant in sorted(variants)] for name, variants in found.items()}
+
+
+class SoundBank:
+    """Plays preloaded sound effects on a pool of channels."""
+    
+    CHANNELS = 12
+    DEFAULT_VOICES = 2
+    
+    # Sounds that can fire many times in a burst get a few more voices
+    VOICE_LIMITS = {"pop": 3, "laser": 3, "blow": 3}
+    
+    # Music started by the loader
+    THEME = "theme"
+    MUSIC_VOLUME = 0.3
+    
+    def __init__(self, sounds, channels=CHANNELS, voice_limits=None, music=None, background=False):
+        """Claim the mixer channels and load every sound variant.
+        
+        Args:
+            sounds: Pygame Zero sounds object
+            channels: Size of the channel pool
+            voice_limits: Dict of sound name to its most simultaneous
+                voices, replacing VOICE_LIMITS
+            music: Optional Pygame Zero music object to start the theme on
+            background: Load on a worker thread instead of before returning;
+                ready is set once it has finished
+        
+        Raises:
+            ValueError: If a sound's voice limit is less than 1
+        """
+        self.voice_limits = SoundBank.VOICE_LIMITS if voice_limits is None else voice_limits
+        for name, limit in self.voice_limits.items():
+            if limit < 1:
+                raise ValueError(f"voice limit of {name!r} must be at least 1, not {limit}")
+        self.variants = {}
+        self.channels = []
+        
+        # Set by the loader when every sound has been tried
+        self.ready = False
+        self.load_seconds = None
+        self._loader = None
+        
+        # Sound name and start order of each channel's voice
+        self._voices = []
+        self._started = 0
+        self._this_tick = set()
+        
+        # Totals since the bank was created, and counts for the current tick.
+        # Skipped sounds were asked for before they had loaded.
+        self.played = self.dropped = self.stolen = self.skipped = 0
+        self.tick_played = self.tick_dropped = self.tick_stolen = self.tick_skipped = 0
+        
+        try:
+            pygame.mixer.set_num_channels(channels)
+            self.channels = [pygame.mixer.Channel(index) for index in range(channels)]
+        except Exception as e:
+            # No audio device: the game runs silently
+            print("Sound disabled:", e)
+            self.channels = []
+            self.ready = True
+        self._voices = [(None, 0)] * len(self.channels)
+        
+        if self.channels:
+            if background:
+                self._loader = threading.Thread(target=self._load, args=(sounds, music),
+                                                name="sound-loader", daemon=True)
+                self._loader.start()
+            else:
+                self._load(sounds, music)
+    
+    def _load(self, sounds, music):
+        start = time.perf_counter()
+        try:
+            if music:
+                music.play(SoundBank.THEME)
+                music.set_volume(SoundBank.MUSIC_VOLUME)
+            # Each sound becomes playable as soon as all its variants are in
+            for name, variants in sound_variants().items():
+                self.variants[name] = [sounds.load(variant) for variant in variants]
+        except Exception as e:
+            print("Sound disabled:", e)
+            self.variants = {}
+        self.load_seconds = time.perf_counter() - start
+        self.ready = True
+    
+    def wait(self, timeout=None):
+        """Block until a background load has finished.
+        
+        Returns:
+            Whether the bank is ready
+        """
+        if self._loader:
+            self._loader.join(timeout)
+        return self.ready
+    
+    def play(self, name, count=1):
+        """Start a sound effect, subject to the voice limits.
+        
+        Args:
+            name: Sound name
+            count: Number of variations to pick from at random
+        """
+        variants = self.variants.get(name)
+        if not variants:
+            # Still loading: skip it rather than decode it now
+            if not self.ready:
+                self.skipped += 1
+                self.tick_skipped += 1
+            return
+        if name in self._this_tick:
+            self.dropped += 1
+            self.tick_dropped += 1
+            return
+        self._this_tick.add(name)
+        
+        sound = variants[random.randint(0, min(count, len(variants)) - 1)]
+        index = self._pick_channel(name)
+        self._started += 1
+        self._voices[index] = (name, self._started)
+        self.channels[index].play(sound)
+        self.played += 1
+        self.tick_played += 1
+    
+    def _pick_channel(self, name):
+        # Free channel, or the oldest voice of this sound once it's at its
+        # cap, or failing both the oldest voice of all
+        free = None
+        oldest = oldest_same = None
+        same = 0
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free is None:
+                    free = index
+                continue
+            voice, started = self._voices[index]
+            if oldest is None or started < self._voices[oldest][1]:
+                oldest = index
+            if voice == name:
+                same += 1
+                if oldest_same is None or started < self._voices[oldest_same][1]:
+                    oldest_same = index
+        
+        if same >= self.voice_limits.get(name, SoundBank.DEFAULT_VOICES):
+            index = oldest_same
+        elif free is not None:
+            return free
+        else:
+            index = oldest
+        self.channels[index].stop()
+        self.stolen += 1
+        self.tick_stolen += 1
+        return index
+    
+    def end_tick(self, profiler=None):
+        """Close a simulation tick, optionally recording its sound counts.
+        
+        Args:
+            profiler: Optional Profiler to receive the per-tick counts
+        """
+        if profiler:
+            profiler.record_count("sounds_played", self.tick_played)
+            profiler.record_count("sounds_dropped", self.tick_dropped)
+            profiler.record_count("sounds_stolen", self.tick_stolen)
+            profiler.record_count("sounds_skipped", self.tick_skipped)
+        self._this_tick.clear()
+        self.tick_played = self.tick_dropped = self.tick_stolen = self.tick_skipped = 0
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Time loading Cavern's sounds up front and in the background.")
+    parser.add_argument("--plays", type=int, default=1000, help="sounds to ask for while the loader runs")
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pgzero.loaders
+    pgzero.loaders.set_root(os.path.dirname(SOUNDS_DIR))
+    pygame.mixer.init(44100, -16, 2, 1024)
+    names = sorted(sound_variants())
+    
+    for background in (False, True):
+        pgzero.loaders.sounds.cache.clear()
+        start = time.perf_counter()
+        bank = SoundBank(pgzero.loaders.sounds, background=background)
+        blocked = time.perf_counter() - start
+        # Ask for sounds at once, as a game starting straight away would
+        for i in range(args.plays):
+            bank.play(names[i % len(names)])
+            bank.end_tick()
+        bank.wait()
+        mode = "background" if background else "up front"
+        print(f"{mode:>10}: blocked {blocked * 1000:6.1f} ms, loaded in {bank.load_seconds * 1000:6.1f} ms, "
+              f"{bank.skipped} of {args.plays} sounds skipped while loading")
+
+
+if __name__ == "__main__":
+    main()
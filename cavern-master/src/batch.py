@@ -0,0 +1,183 @@
+"""Parallel batch simulator for difficulty tuning.
+
+Plays many headless games, each to game over or a frame limit, for every
+combination of a grid of Difficulty settings, spread over a process pool.
+Every run is independent, so throughput grows with the number of worker
+processes. One CSV row is written per run as soon as it finishes.
+
+Each combination is played with the same seeds (seed, seed + 1, ...), so
+settings are compared on identical robot spawns and identical scripted input.
+
+Usage:
+    python -m src.batch --grid max_enemies=4,6,8 --grid fire_probability=0.01,0.02 \\
+        --runs 200 --policy random --out results.csv
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+
+from src.game import Game
+from src.difficulty import Difficulty
+from src.entities.player import Player
+from src.headless import KeyState, POLICIES
+from src.input import InputManager
+
+RESULT_FIELDS = ["level", "score", "frames", "died", "us_per_frame"]
+
+
+@dataclass
+class BatchTask:
+    """One game to play in a worker."""
+    run: int
+    params: dict
+    policy: str
+    seed: int
+    max_frames: int
+
+
+def run_session(task):
+    """Play one game until the player runs out of lives or max_frames pass.
+    
+    Args:
+        task: BatchTask describing the game
+    
+    Returns:
+        Dict with the run's parameters and results, keyed like a CSV row
+    """
+    game = Game(player=Player(), difficulty=Difficulty(**task.params), seed=task.seed)
+    policy = POLICIES[task.policy](task.seed)
+    keys = KeyState()
+    input_manager = InputManager()
+    
+    frame = 0
+    start = time.perf_counter()
+    while frame < task.max_frames and game.player.lives >= 0:
+        policy(frame, keys)
+        game.update(input_manager.capture_input(keys))
+        frame += 1
+    elapsed = time.perf_counter() - start
+    
+    row = {"run": task.run, "seed": task.seed, "policy": task.policy}
+    row.update(task.params)
+    row.update({
+        "level": game.level + 1,
+        "score": game.player.score,
+        "frames": frame,
+        "died": game.player.lives < 0,
+        "us_per_frame": round(elapsed / frame * 1e6, 2) if frame else 0.0,
+    })
+    return row
+
+
+def parse_grid(specs, base=None):
+    """Expand name=v1,v2 specs into one params dict per combination.
+    
+    Args:
+        specs: List of strings naming a Difficulty field and its values
+        base: Difficulty supplying the fields not in the grid
+    
+    Raises:
+        ValueError: If a name is not a Difficulty field, or a combination
+            is not a valid Difficulty
+    """
+    types = {f.name: f.type for f in fields(Difficulty)}
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in types:
+            raise ValueError(f"unknown difficulty setting {name!r}, expected one of {', '.join(types)}")
+        axes.append([(name, types[name](value)) for value in values.split(",")])
+    
+    base_params = asdict(base or Difficulty())
+    grid = [dict(base_params, **dict(combo)) for combo in itertools.product(*axes)]
+    # Check every combination here rather than in the worker processes
+    for params in grid:
+        Difficulty(**params)
+    return grid
+
+
+def make_tasks(grid, runs, policy, seed, max_frames):
+    """Every (combination, repeat) as a BatchTask; repeats share seeds across combinations."""
+    run = 0
+    for params in grid:
+        for repeat in range(runs):
+            yield BatchTask(run, params, policy, seed + repeat, max_frames)
+            run += 1
+
+
+def run_batch(grid, runs, policy, out, seed=0, max_frames=100000, workers=None, progress=None):
+    """Play every task across a process pool, writing CSV rows as runs finish.
+    
+    Args:
+        grid: List of Difficulty params dicts, e.g. from parse_grid()
+        runs: Games per combination
+        policy: Name of a policy in headless.POLICIES
+        out: Writable text file for the CSV
+        seed: First seed of each combination's runs
+        max_frames: Frame limit for a game
+        workers: Number of processes; one per CPU if None
+        progress: Optional callable(done, total) called after each run
+    
+    Returns:
+        Number of runs written
+    """
+    total = len(grid) * runs
+    if total == 0:
+        return 0
+    workers = workers or os.cpu_count() or 1
+    # Small chunks keep workers balanced, as game lengths vary a lot
+    chunksize = max(1, min(16, total // (workers * 16)))
+    
+    writer = csv.DictWriter(out, ["run", "seed", "policy"] + list(grid[0]) + RESULT_FIELDS)
+    writer.writeheader()
+    tasks = make_tasks(grid, runs, policy, seed, max_frames)
+    done = 0
+    with multiprocessing.Pool(workers) as pool:
+        for row in pool.imap_unordered(run_session, tasks, chunksize):
+            writer.writerow(row)
+            out.flush()
+            done += 1
+            if progress:
+                progress(done, total)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless Cavern games in parallel.")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                        help="Difficulty setting and values to try; repeat for more settings")
+    parser.add_argument("--runs", type=int, default=10, help="games per combination")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random", help="scripted input policy")
+    parser.add_argument("--seed", type=int, default=0, help="seed of each combination's first run")
+    parser.add_argument("--max-frames", type=int, default=100000, help="frame limit per game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--out", default="-", help="CSV file to write, or - for stdout")
+    args = parser.parse_args(argv)
+    
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"{done}/{total} runs", file=sys.stderr)
+    
+    start = time.perf_counter()
+    if args.out == "-":
+        done = run_batch(grid, args.runs, args.policy, sys.stdout, args.seed, args.max_frames, args.workers)
+    else:
+        with open(args.out, "w", newline="") as out:
+            done = run_batch(grid, args.runs, args.policy, out, args.seed, args.max_frames, args.workers,
+                             progress)
+    elapsed = time.perf_counter() - start
+    print(f"{done} runs in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
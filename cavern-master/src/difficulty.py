@@ -0,0 +1,41 @@
+"""Difficulty settings for a game session."""
+from dataclasses import dataclass
+
+
+@dataclass
+class Difficulty:
+    """Tunable limits applied by Game and the entities."""
+    max_enemies: int = 6   # Most robots active at once
+    max_orbs: int = 5      # Most orbs the player can have out at once
+    base_enemies: int = 4  # Robots to defeat on level 1; one more per level
+    fire_probability: float = 0.01             # Per-tick chance a ready robot fires
+    fire_probability_per_level: float = 0.001  # Added to it for each level
+    
+    def __post_init__(self):
+        """Reject settings the game can't be played with.
+        
+        Raises:
+            ValueError: If a level would start with no robots to place, or a
+                limit is negative
+        """
+        if self.base_enemies < 1:
+            raise ValueError(f"base_enemies must be at least 1, not {self.base_enemies}")
+        if self.max_enemies < 0:
+            raise ValueError(f"max_enemies can't be negative, not {self.max_enemies}")
+        if self.max_orbs < 0:
+            raise ValueError(f"max_orbs can't be negative, not {self.max_orbs}")
+    
+    def robot_fire_probability(self, level):
+        """Chance per tick that a robot ready to fire does so on a level."""
+        return self.fire_probability + level * self.fire_probability_per_level
+
+
+DEFAULT = Difficulty()
+
+# Stress variant with far more robots and orbs on screen
+HORDE = Difficulty(max_enemies=60, max_orbs=40)
+
+DIFFICULTIES = {
+    "default": DEFAULT,
+    "horde": HORDE,
+}
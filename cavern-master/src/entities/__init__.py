@@ -1,9 +1,27 @@
-"""Entity classes for Cavern game."""
-from src.entities.player import Player
-from src.entities.robot import Robot
-from src.entities.orb import Orb
-from src.entities.bolt import Bolt
-from src.entities.pop import Pop
-from src.entities.fruit import Fruit
-
-__all__ = ['Player', 'Robot', 'Orb', 'Bolt', 'Pop', 'Fruit']
+"""Entity classes for Cavern game.
+
+The classes are imported from their modules on first use, so importing one
+entity module, or this package, doesn't import all of them.
+"""
+import importlib
+
+# Module defining each class
+_MODULES = {
+    'Player': 'player',
+    'Robot': 'robot',
+    'Orb': 'orb',
+    'Bolt': 'bolt',
+    'Pop': 'pop',
+    'Fruit': 'fruit',
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,108 @@
+"""Plain-data actor used by the simulation.
+
+Mirrors the parts of pgzero.actor.Actor the game relies on (anchored
+position, image-sized rect, collidepoint) without loading any images, so
+the game rules can run headless. Drawing is done by the render layer.
+
+Actors and every entity class declare __slots__, so an entity is a small
+fixed record with no per-instance dict, and positions are plain integers.
+"""
+from src.sprites import get_sprite
+
+ANCHOR_CENTRE = ("center", "center")
+ANCHOR_CENTRE_BOTTOM = ("center", "bottom")
+
+ANCHOR_FRACTIONS = {
+    "left": 0.0, "top": 0.0,
+    "center": 0.5, "middle": 0.5,
+    "right": 1.0, "bottom": 1.0,
+}
+
+BLANK = get_sprite("blank")
+
+# Anchor offsets of each (sprite, anchor) pair, shared by every actor using
+# it rather than each holding its own float objects
+_offsets = {}
+
+
+class Actor:
+    """Anchored rectangle whose size follows the current sprite."""
+    
+    __slots__ = ("x", "y", "width", "height", "_sprite", "_anchor_x", "_anchor_y", "_offset_x", "_offset_y")
+    
+    def __init__(self, image, pos, anchor=ANCHOR_CENTRE):
+        self._anchor_x = ANCHOR_FRACTIONS[anchor[0]]
+        self._anchor_y = ANCHOR_FRACTIONS[anchor[1]]
+        self.x, self.y = pos
+        self._sprite = None
+        self.sprite = get_sprite(image)
+    
+    def place(self, pos):
+        """Move to pos showing the blank sprite, as a newly built actor would."""
+        self.sprite = BLANK
+        self.x, self.y = pos
+    
+    @property
+    def sprite(self):
+        return self._sprite
+    
+    @sprite.setter
+    def sprite(self, sprite):
+        # The anchor point stays put; the rect is resized around it
+        if sprite is self._sprite:
+            return
+        self._sprite = sprite
+        self.width = sprite.width
+        self.height = sprite.height
+        key = (sprite, self._anchor_x, self._anchor_y)
+        offsets = _offsets.get(key)
+        if offsets is None:
+            offsets = _offsets[key] = (sprite.width * self._anchor_x, sprite.height * self._anchor_y)
+        self._offset_x, self._offset_y = offsets
+    
+    @property
+    def image(self):
+        return self._sprite.name
+    
+    @image.setter
+    def image(self, name):
+        self.sprite = get_sprite(name)
+    
+    @property
+    def pos(self):
+        return self.x, self.y
+    
+    @pos.setter
+    def pos(self, pos):
+        self.x, self.y = pos
+    
+    @property
+    def left(self):
+        return self.x - self._offset_x
+    
+    @property
+    def right(self):
+        return self.x - self._offset_x + self.width
+    
+    @property
+    def top(self):
+        return self.y - self._offset_y
+    
+    @property
+    def bottom(self):
+        return self.y - self._offset_y + self.height
+    
+    @property
+    def topleft(self):
+        return self.x - self._offset_x, self.y - self._offset_y
+    
+    @property
+    def center(self):
+        return (self.x - self._offset_x + self.width / 2,
+                self.y - self._offset_y + self.height / 2)
+    
+    def collidepoint(self, point):
+        px, py = point
+        left = self.x - self._offset_x
+        top = self.y - self._offset_y
+        return left <= px < left + self.width and top <= py < top + self.height
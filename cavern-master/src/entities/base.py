@@ -1,8 +1,6 @@
 """Base actor classes."""
-from pgzero.actor import Actor
+from src.entities.actor import Actor, ANCHOR_CENTRE, ANCHOR_CENTRE_BOTTOM
 
-ANCHOR_CENTRE = ("center", "center")
-ANCHOR_CENTRE_BOTTOM = ("center", "bottom")
 GRID_BLOCK_SIZE = 25
 LEVEL_X_OFFSET = 50
 NUM_ROWS = 18
@@ -13,44 +11,38 @@ WIDTH = 800
 def sign(x):
     return -1 if x < 0 else 1
 
-def block(game_grid, x, y):
-    grid_x = (x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE
-    grid_y = y // GRID_BLOCK_SIZE
-    if grid_y > 0 and grid_y < NUM_ROWS:
-        row = game_grid[grid_y]
-        return grid_x >= 0 and grid_x < NUM_COLUMNS and len(row) > 0 and row[grid_x] != " "
-    return False
-
 class CollideActor(Actor):
+    __slots__ = ()
+    
     def __init__(self, pos, anchor=ANCHOR_CENTRE):
         super().__init__("blank", pos, anchor)
     
-    def move(self, dx, dy, speed, game_grid):
-        new_x, new_y = int(self.x), int(self.y)
-        for i in range(speed):
-            new_x, new_y = new_x + dx, new_y + dy
-            if new_x < 70 or new_x > 730:
-                return True
-            if ((dy > 0 and new_y % GRID_BLOCK_SIZE == 0 or
-                 dx > 0 and new_x % GRID_BLOCK_SIZE == 0 or
-                 dx < 0 and new_x % GRID_BLOCK_SIZE == GRID_BLOCK_SIZE-1)
-                and block(game_grid, new_x, new_y)):
-                    return True
-            self.pos = new_x, new_y
-        return False
+    def move(self, dx, dy, speed, level_map):
+        x, y = self.x, self.y
+        steps, blocked = level_map.sweep(x, y, dx, dy, speed)
+        if steps > 0:
+            self.pos = x + dx * steps, y + dy * steps
+        return blocked
 
 class GravityActor(CollideActor):
     MAX_FALL_SPEED = 10
     
+    __slots__ = ("vel_y", "landed")
+    
     def __init__(self, pos):
         super().__init__(pos, ANCHOR_CENTRE_BOTTOM)
         self.vel_y = 0
         self.landed = False
     
+    def place(self, pos):
+        super().place(pos)
+        self.vel_y = 0
+        self.landed = False
+    
     def update_gravity(self, game, detect=True):
         self.vel_y = min(self.vel_y + 1, GravityActor.MAX_FALL_SPEED)
         if detect:
-            if self.move(0, sign(self.vel_y), abs(self.vel_y), game.grid):
+            if self.move(0, sign(self.vel_y), abs(self.vel_y), game.level_map):
                 self.vel_y = 0
                 self.landed = True
             if self.top >= HEIGHT:
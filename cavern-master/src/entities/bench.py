@@ -0,0 +1,93 @@
+"""Micro-benchmark of entity memory and attribute overhead.
+
+Reports:
+- the memory each kind of entity takes, measured with tracemalloc over many
+  instances
+- the cost of the attribute reads and writes the update loops make
+- the time per tick of a game populated with many entities
+
+Usage:
+    python -m src.entities.bench --count 10000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from src.game import Game
+from src.entities.robot import Robot
+from src.entities.orb import Orb
+from src.entities.bolt import Bolt
+from src.entities.pop import Pop
+from src.entities.fruit import Fruit
+from src.level import MAX_X, MIN_X
+
+# Builders for one of each entity kind at a position
+KINDS = {
+    "Robot": lambda pos, rng: Robot(pos, 0, rng),
+    "Orb": lambda pos, rng: Orb(pos, 1),
+    "Bolt": lambda pos, rng: Bolt(pos, 1),
+    "Pop": lambda pos, rng: Pop(pos, 0),
+    "Fruit": lambda pos, rng: Fruit(pos, rng),
+}
+
+
+def entity_memory(build, count):
+    """Bytes allocated per entity when building count of them."""
+    rng = random.Random(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [build((400, 200), rng) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding them is not part of the entities
+    return (after - before) / count - 8 if objs else 0.0
+
+
+def attribute_time(count, repeats):
+    """Nanoseconds per read-modify-write of an entity's position and timer."""
+    rng = random.Random(0)
+    robots = [Robot((400, 200), 0, rng) for _ in range(count)]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for robot in robots:
+            robot.x = robot.x + 1
+            robot.y = robot.y - 1
+            robot.fire_timer += 1
+    return (time.perf_counter() - start) / (count * repeats * 3) * 1e9
+
+
+def frame_time(count, frames, seed):
+    """Microseconds per tick of a player-less game with count robots, orbs and bolts."""
+    game = Game(seed=seed)
+    layout = random.Random(seed)
+    for i in range(count):
+        pos = (layout.randint(MIN_X, MAX_X), layout.randint(0, 440))
+        kind = i % 4
+        if kind < 2:
+            game.entities.spawn_robot(pos, layout.randint(0, 1), game.rng)
+        elif kind == 2:
+            game.entities.spawn_orb(pos, layout.choice((-1, 1)))
+        else:
+            game.entities.spawn_bolt(pos, layout.choice((-1, 1)))
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.update(None)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Cavern entity memory and attribute overhead.")
+    parser.add_argument("--count", type=int, default=10000, help="entities to build for each measurement")
+    parser.add_argument("--frames", type=int, default=60, help="ticks to time the populated game for")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the populated game")
+    args = parser.parse_args(argv)
+    
+    for name, build in KINDS.items():
+        print(f"{name:>6}: {entity_memory(build, args.count):6.0f} bytes each")
+    print(f"Attribute read-modify-write: {attribute_time(args.count, 20):.1f} ns")
+    print(f"Tick with {args.count} entities: {frame_time(args.count, args.frames, args.seed) / 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,38 @@
 """Bolt/projectile entity."""
 from src.entities.base import CollideActor
+from src.sprites import sprite_frames
 
 class Bolt(CollideActor):
     SPEED = 7
     
+    # Animation frames indexed by [facing right][frame]
+    FRAMES = (sprite_frames("bolt0", 0, 1), sprite_frames("bolt1", 0, 1))
+    
+    __slots__ = ("direction_x", "active")
+    
     def __init__(self, pos, dir_x):
         super().__init__(pos)
+        self.spawn(pos, dir_x)
+    
+    def spawn(self, pos, dir_x):
+        """Set up a new bolt; also used to recycle one from a pool."""
+        self.place(pos)
         self.direction_x = dir_x
         self.active = True
     
+    def expired(self):
+        return not self.active
+    
     def update(self, game):
-        if self.move(self.direction_x, 0, Bolt.SPEED, game.grid):
+        if self.move(self.direction_x, 0, Bolt.SPEED, game.level_map):
             self.active = False
         else:
-            for obj in game.orbs + [game.player]:
-                if obj and obj.hit_test(self):
+            for orb in game.orb_grid.query_point(self.x, self.y):
+                if orb.hit_test(self):
                     self.active = False
                     break
+            else:
+                if game.player and game.player.hit_test(self):
+                    self.active = False
         
-        direction_idx = "1" if self.direction_x > 0 else "0"
-        anim_frame = str((game.timer // 4) % 2)
-        self.image = "bolt" + direction_idx + anim_frame
+        self.sprite = Bolt.FRAMES[self.direction_x > 0][(game.timer // 4) % 2]
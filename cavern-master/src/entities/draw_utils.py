@@ -1,4 +1,13 @@
-"""Drawing utilities for text and UI."""
+"""Drawing utilities for text and UI.
+
+Text and the status bar are composed into surfaces once and reused: strings
+through a small LRU cache keyed by the text, and the status bar whenever
+the score, lives, health or level it shows changes.
+"""
+from collections import OrderedDict
+
+import pygame
+from pgzero.loaders import images
 
 WIDTH = 800
 HEIGHT = 480
@@ -6,28 +15,102 @@ HEIGHT = 480
 CHAR_WIDTH = [27, 26, 25, 26, 25, 25, 26, 25, 12, 26, 26, 25, 33, 25, 26,
               25, 27, 26, 26, 25, 26, 26, 38, 25, 25, 25]
 
+# Rendered strings kept by text_surface()
+TEXT_CACHE_SIZE = 64
+
+_text_cache = OrderedDict()
+_status_key = None
+_status_surface = None
+
 def char_width(char):
     index = max(0, ord(char) - 65)
     return CHAR_WIDTH[index]
 
-def draw_text(screen, text, y, x=None):
-    if x == None:
-        x = (WIDTH - sum([char_width(c) for c in text])) // 2
+def compose(items):
+    """Draw images into one transparent surface.
+    
+    Blitting the result gives the same pixels as blitting each image in
+    turn. Where an image lands on empty pixels it is copied, alpha included;
+    a plain blend onto a transparent surface would darken its edges. Only
+    columns where it overlaps the images before it are blended.
+    
+    Args:
+        items: List of (surface, (x, y)), in left to right order
+    
+    Returns:
+        Tuple of (surface, (x, y)) giving where to blit it
+    """
+    left = min(x for _, (x, _) in items)
+    top = min(y for _, (_, y) in items)
+    right = max(x + surface.get_width() for surface, (x, _) in items)
+    bottom = max(y + surface.get_height() for surface, (_, y) in items)
+    
+    result = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+    result.fill((0, 0, 0, 0))
+    covered = 0
+    for surface, (x, y) in items:
+        x -= left
+        y -= top
+        width, height = surface.get_size()
+        overlap = max(0, min(width, covered - x))
+        if overlap:
+            result.blit(surface, (x, y), (0, 0, overlap, height))
+        result.blit(surface, (x + overlap, y), (overlap, 0, width - overlap, height),
+                    special_flags=pygame.BLEND_RGBA_MAX)
+        covered = max(covered, x + width)
+    return result, (left, top)
+
+def text_surface(text):
+    """Rendered text from the LRU cache.
+    
+    Returns:
+        Tuple of (surface, width), where width is the text's advance, which
+        centring uses
+    """
+    entry = _text_cache.get(text)
+    if entry is not None:
+        _text_cache.move_to_end(text)
+        return entry
+    
+    glyphs = []
+    x = 0
     for char in text:
-        screen.blit("font0"+str(ord(char)), (x, y))
+        glyphs.append((images.load("font0"+str(ord(char))), (x, 0)))
         x += char_width(char)
+    entry = (compose(glyphs)[0], x)
+    _text_cache[text] = entry
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return entry
+
+def draw_text(screen, text, y, x=None):
+    if not text:
+        return
+    surface, width = text_surface(text)
+    if x == None:
+        x = (WIDTH - width) // 2
+    screen.blit(surface, (x, y))
 
 IMAGE_WIDTH = {"life":44, "plus":40, "health":40}
 
+# Characters the font has glyphs for, and every image drawn by this module
+FONT_CHARS = " 0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+IMAGES = ["font0"+str(ord(char)) for char in FONT_CHARS] + list(IMAGE_WIDTH)
+
+def status_surface(player, level):
+    """The status bar as (surface, position), rendered only when it changes."""
+    global _status_key, _status_surface
+    key = (player.score, player.lives, player.health, level)
+    if key != _status_key:
+        _status_key = key
+        _status_surface = _render_status(player, level)
+    return _status_surface
+
 def draw_status(screen, player, level):
-    # Score
-    number_width = CHAR_WIDTH[0]
-    s = str(player.score)
-    draw_text(screen, s, 451, WIDTH - 2 - (number_width * len(s)))
-    
-    # Level
-    draw_text(screen, "LEVEL " + str(level + 1), 451)
-    
+    surface, pos = status_surface(player, level)
+    screen.blit(surface, pos)
+
+def _render_status(player, level):
     # Lives and health
     lives_health = ["life"] * min(2, player.lives)
     if player.lives > 2:
@@ -35,7 +118,19 @@ def draw_status(screen, player, level):
     if player.lives >= 0:
         lives_health += ["health"] * player.health
     
+    items = []
     x = 0
     for image in lives_health:
-        screen.blit(image, (x, 450))
+        items.append((images.load(image), (x, 450)))
         x += IMAGE_WIDTH[image]
+    
+    # Level
+    text = "LEVEL " + str(level + 1)
+    surface, width = text_surface(text)
+    items.append((surface, ((WIDTH - width) // 2, 451)))
+    
+    # Score
+    number_width = CHAR_WIDTH[0]
+    s = str(player.score)
+    items.append((text_surface(s)[0], (WIDTH - 2 - (number_width * len(s)), 451)))
+    return compose(items)
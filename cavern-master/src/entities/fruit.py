@@ -1,7 +1,7 @@
 """Fruit/powerup entity."""
-from random import choice
 from src.entities.base import GravityActor
 from src.entities.robot import Robot
+from src.sprites import sprite_frames
 
 class Fruit(GravityActor):
     APPLE = 0
@@ -10,24 +10,36 @@ class Fruit(GravityActor):
     EXTRA_HEALTH = 3
     EXTRA_LIFE = 4
     
-    def __init__(self, pos, trapped_enemy_type=0):
+    # Animation frames indexed by [type][(timer // 6) % 4], bouncing 0-1-2-1
+    FRAMES = tuple(sprite_frames("fruit%d" % type, 0, 1, 2, 1) for type in range(5))
+    
+    __slots__ = ("type", "timer")
+    
+    def __init__(self, pos, rng, trapped_enemy_type=0):
         super().__init__(pos)
+        self.spawn(pos, rng, trapped_enemy_type)
+    
+    def spawn(self, pos, rng, trapped_enemy_type=0):
+        """Set up a new fruit; also used to recycle one from a pool."""
+        self.place(pos)
         
         if trapped_enemy_type == Robot.TYPE_NORMAL:
-            self.type = choice([Fruit.APPLE, Fruit.RASPBERRY, Fruit.LEMON])
+            self.type = rng.choice([Fruit.APPLE, Fruit.RASPBERRY, Fruit.LEMON])
         else:
             types = 10 * [Fruit.APPLE, Fruit.RASPBERRY, Fruit.LEMON]
             types += 9 * [Fruit.EXTRA_HEALTH]
             types += [Fruit.EXTRA_LIFE]
-            self.type = choice(types)
+            self.type = rng.choice(types)
         
         self.timer = 0
     
+    def expired(self):
+        return self.timer >= 200
+    
     def update(self, game):
         self.update_gravity(game)
         
         if game.player and game.player.collidepoint(self.center):
-            from src.entities.pop import Pop
             if self.type == Fruit.EXTRA_HEALTH:
                 game.player.health = min(3, game.player.health + 1)
                 game.play_sound("bonus")
@@ -38,13 +50,11 @@ class Fruit(GravityActor):
                 game.player.score += (self.type + 1) * 100
                 game.play_sound("score")
             self.timer = 200
-            game.pops.append(Pop((self.x, self.y - 27), 0))
+            game.entities.spawn_pop((self.x, self.y - 27), 0)
         else:
             self.timer += 1
         
         if self.timer >= 200:
-            from src.entities.pop import Pop
-            game.pops.append(Pop((self.x, self.y - 27), 0))
+            game.entities.spawn_pop((self.x, self.y - 27), 0)
         
-        anim_frame = str([0, 1, 2, 1][(game.timer // 6) % 4])
-        self.image = "fruit" + str(self.type) + anim_frame
+        self.sprite = Fruit.FRAMES[self.type][(game.timer // 6) % 4]
@@ -1,18 +1,39 @@
 """Orb/bubble entity."""
-from random import randint
 from src.entities.base import CollideActor
+from src.sprites import sprite_frames
 
 class Orb(CollideActor):
     MAX_TIMER = 250
     
+    # Animation frames: growing after being blown, floating, and with a
+    # trapped enemy (indexed by [enemy type][frame])
+    BLOWN_FRAMES = sprite_frames("orb", 0, 1, 2)
+    FLOAT_FRAMES = sprite_frames("orb", 3, 4, 5, 6)
+    TRAP_FRAMES = (sprite_frames("trap0", *range(8)), sprite_frames("trap1", *range(8)))
+    
+    __slots__ = ("direction_x", "floating", "_trapped_enemy_type", "timer", "blown_frames")
+    
     def __init__(self, pos, dir_x):
         super().__init__(pos)
+        self.spawn(pos, dir_x)
+    
+    def spawn(self, pos, dir_x):
+        """Set up a new orb; also used to recycle one from a pool."""
+        self.place(pos)
         self.direction_x = dir_x
         self.floating = False
-        self.trapped_enemy_type = None
+        self._trapped_enemy_type = None
         self.timer = -1
         self.blown_frames = 6
     
+    @property
+    def trapped_enemy_type(self):
+        """Type of the enemy inside, or None. Set through EntityRegistry.trap()."""
+        return self._trapped_enemy_type
+    
+    def expired(self):
+        return self.timer >= Orb.MAX_TIMER or self.y <= -40
+    
     def hit_test(self, bolt):
         collided = self.collidepoint(bolt.pos)
         if collided:
@@ -23,25 +44,23 @@ class Orb(CollideActor):
         self.timer += 1
         
         if self.floating:
-            self.move(0, -1, randint(1, 2), game.grid)
+            self.move(0, -1, game.rng.randint(1, 2), game.level_map)
         else:
-            if self.move(self.direction_x, 0, 4, game.grid):
+            if self.move(self.direction_x, 0, 4, game.level_map):
                 self.floating = True
         
         if self.timer == self.blown_frames:
             self.floating = True
         elif self.timer >= Orb.MAX_TIMER or self.y <= -40:
-            from src.entities.pop import Pop
-            from src.entities.fruit import Fruit
-            game.pops.append(Pop(self.pos, 1))
+            game.entities.spawn_pop(self.pos, 1)
             if self.trapped_enemy_type != None:
-                game.fruits.append(Fruit(self.pos, self.trapped_enemy_type))
+                game.entities.spawn_fruit(self.pos, game.rng, self.trapped_enemy_type)
             game.play_sound("pop", 4)
         
         if self.timer < 9:
-            self.image = "orb" + str(self.timer // 3)
+            self.sprite = Orb.BLOWN_FRAMES[self.timer // 3]
         else:
             if self.trapped_enemy_type != None:
-                self.image = "trap" + str(self.trapped_enemy_type) + str((self.timer // 4) % 8)
+                self.sprite = Orb.TRAP_FRAMES[self.trapped_enemy_type][(self.timer // 4) % 8]
             else:
-                self.image = "orb" + str(3 + (((self.timer - 9) // 8) % 4))
+                self.sprite = Orb.FLOAT_FRAMES[((self.timer - 9) // 8) % 4]
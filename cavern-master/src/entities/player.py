@@ -1,16 +1,34 @@
 """Player entity with refactored input handling."""
-from random import randint
 from src.entities.base import GravityActor, WIDTH
+from src.sprites import get_sprite, sprite_frames
 
 class Player(GravityActor):
+    # Animation frames; the paired tables are indexed by [facing right]
+    BLANK = get_sprite("blank")
+    STILL = get_sprite("still")
+    FALL_FRAMES = sprite_frames("fall", 0, 1)
+    RECOIL_FRAMES = sprite_frames("recoil", 0, 1)
+    BLOW_FRAMES = sprite_frames("blow", 0, 1)
+    RUN_FRAMES = (sprite_frames("run0", *range(4)), sprite_frames("run1", *range(4)))
+    
+    __slots__ = ("lives", "score", "direction_x", "fire_timer", "hurt_timer", "health", "blowing_orb")
+    
     def __init__(self):
         super().__init__((0, 0))
         self.lives = 2
         self.score = 0
         self.reset()
     
+    def new_game(self):
+        """Put a reused player back as it starts a game."""
+        self.lives = 2
+        self.score = 0
+        self.landed = False
+        self.sprite = Player.BLANK
+        self.reset()
+    
     def reset(self):
-        self.pos = (WIDTH / 2, 100)
+        self.pos = (WIDTH // 2, 100)
         self.vel_y = 0
         self.direction_x = 1
         self.fire_timer = 0
@@ -45,7 +63,7 @@ class Player(GravityActor):
         
         if self.hurt_timer > 100:
             if self.health > 0:
-                self.move(self.direction_x, 0, 4, game.grid)
+                self.move(self.direction_x, 0, 4, game.level_map)
             else:
                 if self.top >= 480*1.5:
                     self.lives -= 1
@@ -61,15 +79,13 @@ class Player(GravityActor):
             if dx != 0:
                 self.direction_x = dx
                 if self.fire_timer < 10:
-                    self.move(dx, 0, 4, game.grid)
+                    self.move(dx, 0, 4, game.level_map)
             
             # Fire orb using InputState
-            if input_state.fire_pressed and self.fire_timer <= 0 and len(game.orbs) < 5:
-                from src.entities.orb import Orb
+            if input_state.fire_pressed and self.fire_timer <= 0 and len(game.orbs) < game.difficulty.max_orbs:
                 x = min(730, max(70, self.x + self.direction_x * 38))
                 y = self.y - 35
-                self.blowing_orb = Orb((x,y), self.direction_x)
-                game.orbs.append(self.blowing_orb)
+                self.blowing_orb = game.entities.spawn_orb((x,y), self.direction_x)
                 game.play_sound("blow", 4)
                 self.fire_timer = 20
             
@@ -89,17 +105,18 @@ class Player(GravityActor):
             self.blowing_orb = None
         
         # Set sprite
-        self.image = "blank"
+        sprite = Player.BLANK
         if self.hurt_timer <= 0 or self.hurt_timer % 2 == 1:
-            dir_index = "1" if self.direction_x > 0 else "0"
+            facing_right = self.direction_x > 0
             if self.hurt_timer > 100:
                 if self.health > 0:
-                    self.image = "recoil" + dir_index
+                    sprite = Player.RECOIL_FRAMES[facing_right]
                 else:
-                    self.image = "fall" + str((game.timer // 4) % 2)
+                    sprite = Player.FALL_FRAMES[(game.timer // 4) % 2]
             elif self.fire_timer > 0:
-                self.image = "blow" + dir_index
+                sprite = Player.BLOW_FRAMES[facing_right]
             elif dx == 0:
-                self.image = "still"
+                sprite = Player.STILL
             else:
-                self.image = "run" + dir_index + str((game.timer // 8) % 4)
+                sprite = Player.RUN_FRAMES[facing_right][(game.timer // 8) % 4]
+        self.sprite = sprite
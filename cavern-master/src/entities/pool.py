@@ -0,0 +1,74 @@
+"""Object pools for short-lived entities.
+
+Orbs, bolts, pops and fruit are created and discarded constantly during
+play. Pools keep released instances and hand them back out through the
+class's spawn() method, so steady-state gameplay builds no new entities.
+"""
+
+
+class EntityPool:
+    """Free list of released entities of one class.
+    
+    Pooled classes provide spawn(*args), which resets every field that
+    __init__ sets, and expired(), which says when to drop them.
+    """
+    
+    def __init__(self, cls):
+        self.cls = cls
+        self._free = []
+        
+        # Counters
+        self.hits = 0      # acquires served from the free list
+        self.misses = 0    # acquires that had to build a new entity
+        self.live = 0      # entities acquired and not yet released
+        self.peak = 0      # highest value of live so far
+    
+    def acquire(self, *args):
+        """Return an entity set up with args, recycled when possible."""
+        if self._free:
+            obj = self._free.pop()
+            obj.spawn(*args)
+            self.hits += 1
+        else:
+            obj = self.cls(*args)
+            self.misses += 1
+        self.live += 1
+        if self.live > self.peak:
+            self.peak = self.live
+        return obj
+    
+    def release(self, obj):
+        """Return an entity to the pool."""
+        self.live -= 1
+        self._free.append(obj)
+    
+    def release_all(self, objs):
+        """Release every entity in a list and empty it."""
+        for obj in objs:
+            self.release(obj)
+        objs.clear()
+    
+    def compact(self, objs, on_release=None):
+        """Remove expired entities from a list in place, releasing them.
+        
+        Survivors keep their order, so update and draw order are unchanged.
+        
+        Args:
+            objs: List of entities from this pool
+            on_release: Optional callable(obj) run for each expired entity
+                before it is released
+        """
+        write = 0
+        for obj in objs:
+            if obj.expired():
+                if on_release:
+                    on_release(obj)
+                self.release(obj)
+            else:
+                objs[write] = obj
+                write += 1
+        del objs[write:]
+    
+    def stats(self):
+        """Counters as a dict, for reporting."""
+        return {"hits": self.hits, "misses": self.misses, "live": self.live, "peak": self.peak}
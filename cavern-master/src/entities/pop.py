@@ -1,12 +1,26 @@
 """Pop animation entity."""
-from pgzero.actor import Actor
+from src.entities.actor import Actor
+from src.sprites import sprite_frames
 
 class Pop(Actor):
+    # Animation frames indexed by [type][timer // 2]
+    FRAMES = (sprite_frames("pop0", *range(7)), sprite_frames("pop1", *range(7)))
+    
+    __slots__ = ("type", "timer")
+    
     def __init__(self, pos, type):
         super().__init__("blank", pos)
+        self.spawn(pos, type)
+    
+    def spawn(self, pos, type):
+        """Set up a new pop; also used to recycle one from a pool."""
+        self.place(pos)
         self.type = type
         self.timer = -1
     
+    def expired(self):
+        return self.timer >= 12
+    
     def update(self, game):
         self.timer += 1
-        self.image = "pop" + str(self.type) + str(self.timer // 2)
+        self.sprite = Pop.FRAMES[self.type][self.timer // 2]
@@ -0,0 +1,115 @@
+"""Registry owning a game's entity lists, pools and live counts."""
+from src.entities.robot import Robot
+from src.entities.orb import Orb
+from src.entities.bolt import Bolt
+from src.entities.pop import Pop
+from src.entities.fruit import Fruit
+from src.entities.pool import EntityPool
+
+
+class EntityRegistry:
+    """The typed entity lists of a Game, kept with live counters.
+    
+    Entities are spawned and trapped through the registry, which keeps the
+    counts the rules check every frame up to date as it goes, so questions
+    like "is the level clear?" are answered without building lists. The
+    lists themselves are plain and ordered; update and draw iterate them
+    directly.
+    """
+    
+    def __init__(self):
+        self.enemies = []
+        self.pending_enemies = []
+        self.fruits = []
+        self.orbs = []
+        self.bolts = []
+        self.pops = []
+        
+        # Pools recycling the short-lived entities
+        self.orb_pool = EntityPool(Orb)
+        self.bolt_pool = EntityPool(Bolt)
+        self.pop_pool = EntityPool(Pop)
+        self.fruit_pool = EntityPool(Fruit)
+        
+        # Orbs holding a trapped enemy, which keep a level from ending
+        self.trapped_orbs = 0
+    
+    def groups(self):
+        """(name, list) of each live entity type, in update order."""
+        return (("enemies", self.enemies), ("orbs", self.orbs), ("bolts", self.bolts),
+                ("pops", self.pops), ("fruits", self.fruits))
+    
+    def clear(self, pending_enemies=()):
+        """Release every entity and queue a new level's enemy types."""
+        self.enemies.clear()
+        self.pending_enemies[:] = pending_enemies
+        self.fruit_pool.release_all(self.fruits)
+        self.orb_pool.release_all(self.orbs)
+        self.bolt_pool.release_all(self.bolts)
+        self.pop_pool.release_all(self.pops)
+        self.trapped_orbs = 0
+    
+    def spawn_robot(self, pos, type, rng):
+        robot = Robot(pos, type, rng)
+        self.enemies.append(robot)
+        return robot
+    
+    def spawn_orb(self, pos, dir_x):
+        orb = self.orb_pool.acquire(pos, dir_x)
+        self.orbs.append(orb)
+        return orb
+    
+    def spawn_bolt(self, pos, dir_x):
+        bolt = self.bolt_pool.acquire(pos, dir_x)
+        self.bolts.append(bolt)
+        return bolt
+    
+    def spawn_pop(self, pos, type):
+        pop = self.pop_pool.acquire(pos, type)
+        self.pops.append(pop)
+        return pop
+    
+    def spawn_fruit(self, pos, rng, trapped_enemy_type=0):
+        fruit = self.fruit_pool.acquire(pos, rng, trapped_enemy_type)
+        self.fruits.append(fruit)
+        return fruit
+    
+    def trap(self, orb, enemy_type):
+        """Put an enemy of enemy_type inside an orb.
+        
+        The only way to trap one: Orb.trapped_enemy_type is read-only, so
+        trapped_orbs can't miss a change.
+        """
+        if orb.trapped_enemy_type is None:
+            self.trapped_orbs += 1
+        orb._trapped_enemy_type = enemy_type
+    
+    def compact(self):
+        """Remove expired entities, returning them to their pools."""
+        self.bolt_pool.compact(self.bolts)
+        self.fruit_pool.compact(self.fruits)
+        self.pop_pool.compact(self.pops)
+        # Only watch orbs being released while some hold an enemy
+        self.orb_pool.compact(self.orbs, self._orb_released if self.trapped_orbs else None)
+    
+    def _orb_released(self, orb):
+        if orb.trapped_enemy_type is not None:
+            self.trapped_orbs -= 1
+    
+    def enemies_remaining(self):
+        """Enemies on screen plus those still to spawn this level."""
+        return len(self.enemies) + len(self.pending_enemies)
+    
+    def level_clear(self):
+        """Whether nothing is left that keeps the level going."""
+        return not (self.pending_enemies or self.fruits or self.enemies or self.pops
+                    or self.trapped_orbs)
+    
+    def pool_stats(self):
+        """Hit, miss and peak counters of each entity pool."""
+        return {
+            "orbs": self.orb_pool.stats(),
+            "bolts": self.bolt_pool.stats(),
+            "pops": self.pop_pool.stats(),
+            "fruits": self.fruit_pool.stats(),
+        }
@@ -1,15 +1,22 @@
 """Robot enemy entity."""
-from random import choice, randint, random
 from src.entities.base import GravityActor, sign
+from src.sprites import sprite_frames
 
 class Robot(GravityActor):
     TYPE_NORMAL = 0
     TYPE_AGGRESSIVE = 1
     
-    def __init__(self, pos, type):
+    # Animation frames indexed by [type][facing right][frame]
+    FRAMES = tuple(tuple(sprite_frames("robot%d%d" % (type, facing), *range(8))
+                         for facing in range(2))
+                   for type in range(2))
+    
+    __slots__ = ("type", "speed", "direction_x", "alive", "change_dir_timer", "fire_timer")
+    
+    def __init__(self, pos, type, rng):
         super().__init__(pos)
         self.type = type
-        self.speed = randint(1, 3)
+        self.speed = rng.randint(1, 3)
         self.direction_x = 1
         self.alive = True
         self.change_dir_timer = 0
@@ -20,34 +27,33 @@ class Robot(GravityActor):
         self.change_dir_timer -= 1
         self.fire_timer += 1
         
-        if self.move(self.direction_x, 0, self.speed, game.grid):
+        if self.move(self.direction_x, 0, self.speed, game.level_map):
             self.change_dir_timer = 0
         
         if self.change_dir_timer <= 0:
             directions = [-1, 1]
             if game.player:
-                directions.append(sign(game.player.x - self.x))
-            self.direction_x = choice(directions)
-            self.change_dir_timer = randint(100, 250)
+                # Head for the player's platform, or straight at them once on it
+                directions.append(game.nav.direction(self.x, self.y, game.player.x, game.player.y)
+                                  or sign(game.player.x - self.x))
+            self.direction_x = game.rng.choice(directions)
+            self.change_dir_timer = game.rng.randint(100, 250)
         
         if self.type == Robot.TYPE_AGGRESSIVE and self.fire_timer >= 24:
-            for orb in game.orbs:
+            for orb in game.orb_grid.query_rect(self.x - 200, self.top, self.x + 200, self.bottom):
                 if orb.y >= self.top and orb.y < self.bottom and abs(orb.x - self.x) < 200:
                     self.direction_x = sign(orb.x - self.x)
                     self.fire_timer = 0
                     break
         
         if self.fire_timer >= 12:
-            fire_probability = 0.01 + game.level * 0.001
+            fire_probability = game.difficulty.robot_fire_probability(game.level)
             if game.player and self.top < game.player.bottom and self.bottom > game.player.top:
                 fire_probability *= 10
-            if random() < fire_probability:
+            if game.rng.random() < fire_probability:
                 self.fire_timer = 0
                 game.play_sound("laser", 4)
         elif self.fire_timer == 8:
-            from src.entities.bolt import Bolt
-            game.bolts.append(Bolt((self.x + self.direction_x * 20, self.y - 38), self.direction_x))
+            game.entities.spawn_bolt((self.x + self.direction_x * 20, self.y - 38), self.direction_x)
         
-        dir_index = "1" if self.direction_x > 0 else "0"
-        anim_frame = str((game.timer // 6) % 8)
-        self.image = "robot" + str(self.type) + dir_index + anim_frame
+        self.sprite = Robot.FRAMES[self.type][self.direction_x > 0][(game.timer // 6) % 8]
@@ -1,11 +1,13 @@
 """Game logic extracted from original cavern.py"""
-from random import choice, randint, random, shuffle
+import random
+from time import perf_counter
 from src.entities.player import Player
-from src.entities.robot import Robot
-from src.entities.orb import Orb
-from src.entities.bolt import Bolt
-from src.entities.pop import Pop
-from src.entities.fruit import Fruit
+from src.entities.registry import EntityRegistry
+from src.difficulty import DEFAULT
+from src.spatial import SpatialHash
+from src.level import compile_level
+from src.levelpack import default_pack
+from src.navigation import navigation_graph
 
 # Constants
 NUM_ROWS = 18
@@ -13,115 +15,120 @@ NUM_COLUMNS = 28
 LEVEL_X_OFFSET = 50
 GRID_BLOCK_SIZE = 25
 
-LEVELS = [
-    # Level 1 - 18 rows
-    ["XXXXX     XXXXXXXX     XXXXX",
-     "", "", "", "",
-     "   XXXXXXX        XXXXXXX   ",
-     "", "", "",
-     "   XXXXXXXXXXXXXXXXXXXXXX   ",
-     "", "", "",
-     "XXXXXXXXX          XXXXXXXXX",
-     "", "", ""],
-
-    # Level 2 - 18 rows
-    ["XXXX    XXXXXXXXXXXX    XXXX",
-     "", "", "", "",
-     "    XXXXXXXXXXXXXXXXXXXX    ",
-     "", "", "",
-     "XXXXXX                XXXXXX",
-     "      X              X      ",
-     "       X            X       ",
-     "        X          X        ",
-     "         X        X         ",
-     "", "", ""],
-
-    # Level 3 - 18 rows
-    ["XXXX    XXXX    XXXX    XXXX",
-     "", "", "", "",
-     "  XXXXXXXX        XXXXXXXX  ",
-     "", "", "",
-     "XXXX      XXXXXXXX      XXXX",
-     "", "", "",
-     "    XXXXXX        XXXXXX    ",
-     "", "", ""]
-]
-
-
-def block(game_grid, x, y):
-    """Check if there's a level grid block at these coordinates."""
-    grid_x = (x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE
-    grid_y = y // GRID_BLOCK_SIZE
-    if grid_y > 0 and grid_y < NUM_ROWS:
-        row = game_grid[grid_y]
-        return grid_x >= 0 and grid_x < NUM_COLUMNS and len(row) > 0 and row[grid_x] != " "
-    else:
-        return False
-
 
 class Game:
     """Main game logic for Cavern."""
     
-    def __init__(self, player=None, sounds=None):
+    def __init__(self, player=None, sounds=None, difficulty=DEFAULT, profiler=None, seed=None,
+                 level_pack=None):
         self.player = player
         self.sounds = sounds
+        self.difficulty = difficulty
+        self.profiler = profiler
+        # Levels repeat from the start once the pack runs out
+        self.level_pack = level_pack or default_pack()
+        
+        # Every random decision the rules make comes from this generator, so
+        # the seed plus the input stream reproduces a game exactly. It is
+        # seeded by reset().
+        self.seed = None
+        self.rng = random.Random()
         self.timer = 0
         self.level = 0
         self.level_colour = 0
         
-        # Game object lists
-        self.enemies = []
-        self.pending_enemies = []
-        self.fruits = []
-        self.orbs = []
-        self.bolts = []
-        self.pops = []
+        # Game objects, with their pools and live counts. The lists are
+        # also reachable as attributes of the game for reading.
+        self.entities = EntityRegistry()
+        self.enemies = self.entities.enemies
+        self.pending_enemies = self.entities.pending_enemies
+        self.fruits = self.entities.fruits
+        self.orbs = self.entities.orbs
+        self.bolts = self.entities.bolts
+        self.pops = self.entities.pops
+        
+        # Broadphase of orb positions for robot targeting and bolt hits
+        self.orb_grid = SpatialHash(self.orbs)
         
         # Set up level grid
         self.grid = []
+        self.level_map = None
+        self.nav = None
+        self.level_layer = None
+        self.reset(seed)
+    
+    def reset(self, seed=None):
+        """Start a new game from the first level, reusing this instance.
+        
+        The entity pools, collision maps and navigation graphs are kept, so
+        a reset game starts without the cost of building a new one. It then
+        plays exactly as a new Game with the same seed would.
+        
+        Args:
+            seed: Seed for the new game; a random one if None
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.timer = 0
+        self.level = 0
+        if self.player:
+            self.player.new_game()
         self.setup_level()
     
+    def load_level(self):
+        """Set the grid, collision map, navigation graph and colour for the current level number.
+        
+        Returns:
+            The level's LevelInfo
+        """
+        # Only this level is decoded from the pack; its grid is shared, not copied
+        info = self.level_pack.level(self.level % len(self.level_pack))
+        self.grid = info.grid
+        # Collision tables are built once per layout and shared
+        self.level_map = compile_level(self.grid)
+        # Robot steering table, also built once per layout
+        self.nav = navigation_graph(self.level_map)
+        self.level_colour = self.level % 4 if info.colour is None else info.colour
+        # Pre-rendered background, filled in by the renderer when drawn
+        self.level_layer = None
+        return info
+    
     def setup_level(self):
         """Initialize a new level."""
-        # Get level grid (17 rows)
-        self.grid = LEVELS[self.level % len(LEVELS)]
-        # The last row is a copy of the first row (makes 18 total)
-        # Create new list to avoid modifying LEVELS
-        self.grid = self.grid + [self.grid[0]]
-        self.level_colour = self.level % 4
-        
-        # Clear all game objects
-        self.enemies.clear()
-        self.pending_enemies.clear()
-        self.fruits.clear()
-        self.orbs.clear()
-        self.bolts.clear()
-        self.pops.clear()
+        info = self.load_level()
         
         # Set up pending enemies for this level
-        num_enemies = 4 + self.level
+        num_enemies = self.difficulty.base_enemies + self.level if info.enemies is None else info.enemies
         enemy_types = [0] * num_enemies
         
         # Some enemies will be type 1 (which can drop power-ups)
-        num_type1 = (self.level // 3) + 1
+        num_type1 = (self.level // 3) + 1 if info.aggressive is None else info.aggressive
         for i in range(num_type1):
-            enemy_types[randint(0, num_enemies - 1)] = 1
+            enemy_types[self.rng.randint(0, num_enemies - 1)] = 1
         
-        shuffle(enemy_types)
-        self.pending_enemies = enemy_types
+        self.rng.shuffle(enemy_types)
+        
+        # Clear all game objects
+        self.entities.clear(enemy_types)
         
         # Position player
         if self.player:
             self.player.pos = (400, 100)
             self.player.direction_x = 1
     
+    def pool_stats(self):
+        """Hit, miss and peak counters of each entity pool."""
+        return self.entities.pool_stats()
+    
     def max_enemies(self):
         """Maximum number of enemies that can be active at once."""
-        return min(self.level + 2, 6)
+        return min(self.level + 2, self.difficulty.max_enemies)
     
     def get_robot_spawn_x(self):
         """Get random x position for spawning a robot."""
-        return choice([100, 250, 400, 550, 700])
+        return self.rng.choice([100, 250, 400, 550, 700])
     
     def next_level(self):
         """Advance to next level."""
@@ -137,65 +144,64 @@ class Game:
         Args:
             input_state: InputState object with current frame's input
         """
+        prof = self.profiler
+        if prof:
+            start = lap = perf_counter()
+        entities = self.entities
+        
         self.timer += 1
         
         # Update player
         if self.player:
             self.player.update(input_state, self)
-        
-        # Update all game objects
-        for obj_list in [self.enemies, self.orbs, self.bolts, self.pops, self.fruits]:
-            for obj in obj_list:
-                obj.update(self)
-        
-        # Remove inactive objects
-        self.bolts = [b for b in self.bolts if b.active]
-        self.fruits = [f for f in self.fruits if f.timer < 200]
-        self.pops = [p for p in self.pops if p.timer < 12]
-        self.orbs = [o for o in self.orbs if o.timer < 250 and o.y > -40]
+        if prof:
+            lap = prof.lap("update.player", lap)
+        
+        # Update all game objects. Robots see the orbs where they were at the
+        # start of the frame and bolts see them after they have moved.
+        self.orb_grid.invalidate()
+        for obj in self.enemies:
+            obj.update(self)
+        if prof:
+            lap = prof.lap("update.enemies", lap)
+        for obj in self.orbs:
+            obj.update(self)
+        if prof:
+            lap = prof.lap("update.orbs", lap)
+        self.orb_grid.invalidate()
+        for obj in self.bolts:
+            obj.update(self)
+        if prof:
+            lap = prof.lap("update.bolts", lap)
+        for obj in self.pops:
+            obj.update(self)
+        if prof:
+            lap = prof.lap("update.pops", lap)
+        for obj in self.fruits:
+            obj.update(self)
+        if prof:
+            prof.lap("update.fruits", lap)
+        
+        # Remove inactive objects, returning them to their pools
+        entities.compact()
         
         # Every 100 frames, create random fruit
-        if self.timer % 100 == 0 and len(self.pending_enemies + self.enemies) > 0:
-            self.fruits.append(Fruit((randint(70, 730), randint(75, 400))))
+        if self.timer % 100 == 0 and entities.enemies_remaining() > 0:
+            pos = (self.rng.randint(70, 730), self.rng.randint(75, 400))
+            entities.spawn_fruit(pos, self.rng)
         
         # Every 81 frames, spawn enemy if possible
         if self.timer % 81 == 0 and len(self.pending_enemies) > 0 and len(self.enemies) < self.max_enemies():
             robot_type = self.pending_enemies.pop()
             pos = (self.get_robot_spawn_x(), -30)
-            self.enemies.append(Robot(pos, robot_type))
+            entities.spawn_robot(pos, robot_type, self.rng)
         
         # Check for level completion
-        if len(self.pending_enemies + self.fruits + self.enemies + self.pops) == 0:
-            if len([orb for orb in self.orbs if orb.trapped_enemy_type != None]) == 0:
-                self.next_level()
-    
-    def draw(self, screen):
-        """Draw the game state.
+        if entities.level_clear():
+            self.next_level()
         
-        Args:
-            screen: Pygame Zero screen object
-        """
-        # Draw background
-        screen.blit("bg%d" % self.level_colour, (0, 0))
-        
-        # Draw level blocks
-        block_sprite = "block" + str(self.level % 4)
-        for row_y in range(NUM_ROWS):
-            row = self.grid[row_y]
-            if len(row) > 0:
-                x = LEVEL_X_OFFSET
-                for block_char in row:
-                    if block_char != ' ':
-                        screen.blit(block_sprite, (x, row_y * GRID_BLOCK_SIZE))
-                    x += GRID_BLOCK_SIZE
-        
-        # Draw all game objects
-        all_objs = self.fruits + self.bolts + self.enemies + self.pops + self.orbs
-        if self.player:
-            all_objs.append(self.player)
-        for obj in all_objs:
-            if obj:
-                obj.draw()
+        if prof:
+            prof.lap("game.update", start)
     
     def play_sound(self, name, count=1):
         """Play a sound effect.
@@ -203,10 +209,11 @@ class Game:
         Args:
             name: Sound name
             count: Number of sound variations (will pick random)
+        
+        self.sounds is a SoundBank, which picks the variation from the
+        global random module rather than self.rng, so whether sound is on
+        never changes the simulation. A sound the bank hasn't loaded yet is
+        skipped.
         """
         if self.player and self.sounds:
-            try:
-                sound = getattr(self.sounds, name + str(randint(0, count - 1)))
-                sound.play()
-            except Exception as e:
-                print(e)
+            self.sounds.play(name, count)
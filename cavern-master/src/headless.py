@@ -0,0 +1,160 @@
+"""Headless simulation runner.
+
+Steps the game rules without Pygame Zero or a display, as fast as the CPU
+allows. Used for balance testing and soak runs on machines with no screen.
+
+Usage:
+    python -m src.headless --frames 100000 --policy random --seed 1
+"""
+import argparse
+import random
+import time
+from dataclasses import dataclass
+
+from src.game import Game
+from src.difficulty import DEFAULT, DIFFICULTIES
+from src.entities.player import Player
+from src.input import InputManager
+from src.levelpack import load_pack
+from src.profiler import Profiler
+from src.replay import Recorder
+
+
+class KeyState:
+    """Stand-in for the Pygame Zero keyboard, holding the keys the game reads."""
+    
+    def __init__(self):
+        self.space = False
+        self.up = False
+        self.p = False
+        self.left = False
+        self.right = False
+        self.f3 = False
+
+
+class IdlePolicy:
+    """Never touches the keyboard."""
+    
+    def __call__(self, frame, keys):
+        pass
+
+
+class RandomPolicy:
+    """Mashes keys at random, holding each choice for a few frames."""
+    
+    HOLD_FRAMES = 8
+    
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+    
+    def __call__(self, frame, keys):
+        if frame % RandomPolicy.HOLD_FRAMES == 0:
+            move = self.rng.random()
+            keys.left = move < 0.35
+            keys.right = move > 0.65
+            keys.up = self.rng.random() < 0.2
+            keys.space = self.rng.random() < 0.3
+
+
+# Policy factories, each taking the run's seed
+POLICIES = {
+    "idle": lambda seed: IdlePolicy(),
+    "random": RandomPolicy,
+}
+
+
+@dataclass
+class HeadlessResult:
+    """Summary of a headless run."""
+    frames: int = 0
+    games: int = 0
+    best_level: int = 0
+    best_score: int = 0
+    elapsed: float = 0.0
+    
+    @property
+    def fps(self):
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def run(frames, policy, seed=None, difficulty=DEFAULT, profiler=None, recorder=None, level_pack=None):
+    """Simulate a number of frames, starting a new game whenever one ends.
+    
+    Args:
+        frames: Number of simulation ticks to run
+        policy: Callable(frame, keys) that sets the keys for each frame
+        seed: Optional seed from which each game's seed is drawn
+        difficulty: Difficulty settings for each game
+        profiler: Optional Profiler collecting per-tick timings
+        recorder: Optional Recorder capturing the first game
+        level_pack: LevelPack to play; the shipped levels if None
+    
+    Returns:
+        HeadlessResult describing the run
+    """
+    seeds = random.Random(seed)
+    
+    keys = KeyState()
+    input_manager = InputManager()
+    result = HeadlessResult()
+    game = None
+    
+    start = time.perf_counter()
+    for frame in range(frames):
+        if game is None:
+            game = Game(player=Player(), difficulty=difficulty, profiler=profiler,
+                        seed=seeds.getrandbits(32), level_pack=level_pack)
+            result.games += 1
+            if recorder and result.games == 1:
+                recorder.start(game)
+        
+        policy(frame, keys)
+        input_state = input_manager.capture_input(keys)
+        game.update(input_state)
+        if recorder and result.games == 1:
+            recorder.record(input_state, game)
+        if profiler:
+            profiler.end_tick()
+        
+        result.best_level = max(result.best_level, game.level + 1)
+        result.best_score = max(result.best_score, game.player.score)
+        if game.player.lives < 0:
+            game = None
+    result.elapsed = time.perf_counter() - start
+    result.frames = frames
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Cavern simulation without a display.")
+    parser.add_argument("--frames", type=int, default=10000, help="number of ticks to simulate")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random", help="scripted input policy")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the game and policy")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="default", help="difficulty preset")
+    parser.add_argument("--profile", metavar="PATH", help="write per-section timings to a JSON file")
+    parser.add_argument("--record", metavar="PATH", help="record the first game for src.replay")
+    parser.add_argument("--levels", metavar="PATH", help="level pack to play, text or compiled")
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        profiler.instrument_moves()
+    recorder = Recorder(args.record) if args.record else None
+    level_pack = load_pack(args.levels) if args.levels else None
+    result = run(args.frames, POLICIES[args.policy](args.seed), args.seed, DIFFICULTIES[args.difficulty],
+                 profiler, recorder, level_pack)
+    print(f"{result.frames} frames, {result.games} games, best level {result.best_level}, "
+          f"best score {result.best_score}")
+    print(f"{result.elapsed:.2f}s elapsed, {result.fps:.0f} frames/s")
+    if profiler:
+        profiler.remove_instrumentation()
+        profiler.dump(args.profile)
+        print(f"Profile written to {args.profile}")
+    if recorder:
+        recorder.save()
+        print(f"First game recorded to {args.record}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,29 @@
-"""Input handling with edge detection for Cavern game."""
-from dataclasses import dataclass
+"""Input handling with edge detection for Cavern game.
+
+InputManager polls the Pygame Zero keyboard once per frame. EventInputManager
+builds the same InputState from key events instead, so a key pressed and
+released between two frames still registers, and it keeps histograms of
+the time from each press to the simulation tick that acts on it.
+
+Usage (presses caught by polling and by events at low frame rates):
+    python -m src.input --fps 60 30 20 10
+"""
+import random
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+
+import pygame
+
+# Keys the game reads, by pygame key code, named after what they do
+ACTIONS = {
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_UP: "jump",
+    pygame.K_SPACE: "fire",
+    pygame.K_p: "pause",
+    pygame.K_F3: "overlay",
+}
 
 
 @dataclass
@@ -12,6 +36,33 @@ class InputState:
     fire_held: bool = False      # Level detection - SPACE held
     pause_pressed: bool = False  # Edge detection - P key
     menu_start: bool = False     # Edge detection - SPACE in menu
+    overlay_pressed: bool = False  # Edge detection - F3 profiler overlay
+    
+    def merged_with(self, newer):
+        """Combine with a later snapshot that no tick has consumed yet.
+        
+        Level fields come from the newer snapshot; edges seen in either are
+        kept so a press is never lost between simulation ticks.
+        """
+        return replace(
+            newer,
+            jump_pressed=self.jump_pressed or newer.jump_pressed,
+            fire_pressed=self.fire_pressed or newer.fire_pressed,
+            pause_pressed=self.pause_pressed or newer.pause_pressed,
+            menu_start=self.menu_start or newer.menu_start,
+            overlay_pressed=self.overlay_pressed or newer.overlay_pressed
+        )
+    
+    def without_edges(self):
+        """Copy with the edge fields cleared, for ticks after the first."""
+        return replace(
+            self,
+            jump_pressed=False,
+            fire_pressed=False,
+            pause_pressed=False,
+            menu_start=False,
+            overlay_pressed=False
+        )
 
 
 class InputManager:
@@ -21,6 +72,7 @@ class InputManager:
         self._space_was_down = False
         self._up_was_down = False
         self._p_was_down = False
+        self._f3_was_down = False
     
     def capture_input(self, keyboard) -> InputState:
         """Capture current input state with edge detection.
@@ -43,6 +95,10 @@ class InputManager:
         p_pressed = keyboard.p and not self._p_was_down
         self._p_was_down = keyboard.p
         
+        # Detect F3 edge (just pressed)
+        f3_pressed = keyboard.f3 and not self._f3_was_down
+        self._f3_was_down = keyboard.f3
+        
         return InputState(
             left=keyboard.left,
             right=keyboard.right,
@@ -50,5 +106,198 @@ class InputManager:
             fire_pressed=space_pressed,       # SPACE for firing orbs
             fire_held=keyboard.space,         # SPACE held to blow further
             pause_pressed=p_pressed,
-            menu_start=space_pressed          # SPACE also starts game from menu
+            menu_start=space_pressed,         # SPACE also starts game from menu
+            overlay_pressed=f3_pressed
+        )
+    
+    def key_down(self, key, timestamp=None):
+        """Key events are ignored; polling reads the keyboard instead."""
+    
+    def key_up(self, key, timestamp=None):
+        """Key events are ignored; polling reads the keyboard instead."""
+    
+    def consumed(self, now=None, profiler=None):
+        """Polling has no press times, so there is no latency to record."""
+
+
+class LatencyHistogram:
+    """Counts of latencies in doubling millisecond buckets."""
+    
+    # Upper bounds of the buckets in ms; the last bucket takes anything longer
+    BOUNDS_MS = (1, 2, 4, 8, 16, 32, 64, 128)
+    
+    def __init__(self):
+        self.counts = [0] * (len(LatencyHistogram.BOUNDS_MS) + 1)
+        self.total = 0
+    
+    def add(self, seconds):
+        self.counts[bisect_right(LatencyHistogram.BOUNDS_MS, seconds * 1000)] += 1
+        self.total += 1
+    
+    @staticmethod
+    def labels():
+        """Bucket labels, such as "<4" for 2 to 4 ms, in bucket order."""
+        bounds = LatencyHistogram.BOUNDS_MS
+        return [f"<{bound}" for bound in bounds] + [f">={bounds[-1]}"]
+
+
+class EventInputManager(InputManager):
+    """Builds InputStates from key events rather than by polling.
+    
+    Pygame Zero's on_key_down and on_key_up hooks hand each event to
+    key_down() and key_up(), which stamp it with the time. capture_input()
+    reports every key that went down since the last capture as pressed, and
+    as held, even if it has already come back up, so a tap that falls
+    between two frames is seen for one tick just as a polled press is.
+    
+    pygame events carry no time of their own, so a press is stamped when it
+    is dispatched at the start of a frame, and time it spent queued before
+    that isn't counted.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._down = set()
+        # Action -> time of its first press since the last capture
+        self._pressed = {}
+        # (action, time pressed) captured but not yet acted on by a tick
+        self._unconsumed = []
+        self.latency = {action: LatencyHistogram() for action in ACTIONS.values()}
+    
+    def key_down(self, key, timestamp=None):
+        """Note a key press.
+        
+        Args:
+            key: pygame or Pygame Zero key code
+            timestamp: time.perf_counter() time of the press; now if None
+        """
+        action = ACTIONS.get(key)
+        if action is None or action in self._down:
+            return
+        self._down.add(action)
+        if action not in self._pressed:
+            self._pressed[action] = time.perf_counter() if timestamp is None else timestamp
+    
+    def key_up(self, key, timestamp=None):
+        self._down.discard(ACTIONS.get(key))
+    
+    def capture_input(self, keyboard=None) -> InputState:
+        """Capture the presses since the last capture and the keys held now.
+        
+        Args:
+            keyboard: Unused; the key state comes from the events
+            
+        Returns:
+            InputState object with current frame's input
+        """
+        pressed, down = self._pressed, self._down
+        self._unconsumed.extend(pressed.items())
+        self._pressed = {}
+        return InputState(
+            left="left" in down or "left" in pressed,
+            right="right" in down or "right" in pressed,
+            jump_pressed="jump" in pressed,
+            fire_pressed="fire" in pressed,
+            fire_held="fire" in down or "fire" in pressed,
+            pause_pressed="pause" in pressed,
+            menu_start="fire" in pressed,
+            overlay_pressed="overlay" in pressed
         )
+    
+    def consumed(self, now=None, profiler=None):
+        """Record the latency of the captured presses a tick has just acted on.
+        
+        Args:
+            now: time.perf_counter() time of the tick; now if None
+            profiler: Optional Profiler, given each latency as an
+                "input.<action>" section
+        """
+        if not self._unconsumed:
+            return
+        if now is None:
+            now = time.perf_counter()
+        for action, pressed_at in self._unconsumed:
+            self.latency[action].add(now - pressed_at)
+            if profiler:
+                profiler.record("input." + action, now - pressed_at)
+        self._unconsumed.clear()
+
+
+def caught_presses(fps, taps, seed):
+    """Presses seen by polling and by events when taps are shorter than a frame.
+    
+    Jump and fire are tapped for 20 to 90 ms at a time, with gaps of 100 to
+    400 ms, and each frame captures input once, as App does when every
+    frame runs a tick.
+    
+    Args:
+        fps: Frames per second
+        taps: Number of taps
+        seed: Seed for the tap timings
+    
+    Returns:
+        Tuple of (presses polled, presses from events, event LatencyHistogram
+        of all actions)
+    """
+    from src.headless import KeyState
+    
+    timing = random.Random(seed)
+    events = []
+    now = 0.0
+    for _ in range(taps):
+        key, name = timing.choice(((pygame.K_UP, "up"), (pygame.K_SPACE, "space")))
+        now += timing.uniform(0.1, 0.4)
+        events.append((now, key, name, True))
+        now += timing.uniform(0.02, 0.09)
+        events.append((now, key, name, False))
+    
+    keys = KeyState()
+    polling = InputManager()
+    event_input = EventInputManager()
+    polled = from_events = 0
+    next_event = 0
+    frame = 0
+    while next_event < len(events):
+        frame += 1
+        frame_time = frame / fps
+        while next_event < len(events) and events[next_event][0] <= frame_time:
+            timestamp, key, name, down = events[next_event]
+            setattr(keys, name, down)
+            if down:
+                event_input.key_down(key, timestamp)
+            else:
+                event_input.key_up(key, timestamp)
+            next_event += 1
+        state = polling.capture_input(keys)
+        polled += state.jump_pressed + state.fire_pressed
+        state = event_input.capture_input()
+        from_events += state.jump_pressed + state.fire_pressed
+        event_input.consumed(frame_time)
+    
+    latency = LatencyHistogram()
+    for histogram in event_input.latency.values():
+        latency.counts = [a + b for a, b in zip(latency.counts, histogram.counts)]
+        latency.total += histogram.total
+    return polled, from_events, latency
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare polled and event-driven input at low frame rates.")
+    parser.add_argument("--fps", type=int, nargs="+", default=[60, 30, 20, 10],
+                        help="frame rates to simulate")
+    parser.add_argument("--taps", type=int, default=1000, help="key taps at each frame rate")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the tap timings")
+    args = parser.parse_args(argv)
+    
+    labels = LatencyHistogram.labels()
+    print(f"{'fps':>4} {'taps':>5} {'polled':>7} {'events':>7}   event latency ms: "
+          + " ".join(f"{label:>5}" for label in labels))
+    for fps in args.fps:
+        polled, from_events, latency = caught_presses(fps, args.taps, args.seed)
+        print(f"{fps:>4} {args.taps:>5} {polled:>7} {from_events:>7}                     "
+              + " ".join(f"{count:>5}" for count in latency.counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Compiled level collision maps.
+
+A level grid is compiled once into a solid-cell map plus, for every cell,
+the furthest coordinate an actor can reach from it in each direction before
+hitting a wall. CollideActor.move then resolves a whole move with one table
+lookup instead of testing the grid one pixel at a time.
+"""
+from collections import OrderedDict
+
+NUM_ROWS = 18
+NUM_COLUMNS = 28
+LEVEL_X_OFFSET = 50
+GRID_BLOCK_SIZE = 25
+
+# Horizontal limits of the playfield for an actor's anchor point
+MIN_X = 70
+MAX_X = 730
+
+# Stand-in for "no floor below"; larger than any reachable y
+NO_FLOOR = 1 << 30
+
+# Layouts kept compiled, most recently used last; a long pack only ever
+# holds the last few
+MAX_COMPILED = 8
+_compiled = OrderedDict()
+
+
+class CompiledLevel:
+    """Solid-cell map of a level grid with per-cell wall distance tables."""
+    
+    def __init__(self, grid):
+        """Compile a level grid.
+        
+        Args:
+            grid: List of NUM_ROWS strings, ' ' for empty and anything else solid
+        """
+        self.solid = bytearray(NUM_ROWS * NUM_COLUMNS)
+        # Row 0 is never solid: the original per-pixel check ignored it
+        for row_y in range(1, NUM_ROWS):
+            row = grid[row_y]
+            for col, block_char in enumerate(row[:NUM_COLUMNS]):
+                if block_char != " ":
+                    self.solid[row_y * NUM_COLUMNS + col] = 1
+        
+        # Furthest x reachable moving right/left from each cell of each row
+        self.right_stop = []
+        self.left_stop = []
+        for row_y in range(NUM_ROWS):
+            right, left = [MAX_X] * NUM_COLUMNS, [MIN_X] * NUM_COLUMNS
+            wall_x = MAX_X + 1
+            for col in range(NUM_COLUMNS - 1, -1, -1):
+                right[col] = min(wall_x - 1, MAX_X)
+                if self.is_solid(col, row_y):
+                    wall_x = LEVEL_X_OFFSET + col * GRID_BLOCK_SIZE
+            wall_x = MIN_X - 1
+            for col in range(NUM_COLUMNS):
+                left[col] = max(wall_x + 1, MIN_X)
+                if self.is_solid(col, row_y):
+                    wall_x = LEVEL_X_OFFSET + col * GRID_BLOCK_SIZE + GRID_BLOCK_SIZE - 1
+            self.right_stop.append(right)
+            self.left_stop.append(left)
+        
+        # Furthest y reachable falling from each cell of each column
+        self.down_stop = []
+        for col in range(NUM_COLUMNS):
+            down = [NO_FLOOR] * NUM_ROWS
+            floor_y = NO_FLOOR
+            for row_y in range(NUM_ROWS - 1, -1, -1):
+                down[row_y] = floor_y
+                if self.is_solid(col, row_y):
+                    floor_y = row_y * GRID_BLOCK_SIZE - 1
+            self.down_stop.append(down)
+    
+    def is_solid(self, col, row_y):
+        """Check whether a grid cell holds a block."""
+        return (0 <= col < NUM_COLUMNS and 0 <= row_y < NUM_ROWS
+                and self.solid[row_y * NUM_COLUMNS + col] == 1)
+    
+    def sweep(self, x, y, dx, dy, speed):
+        """Resolve a move of up to speed one-pixel steps from integer (x, y).
+        
+        Gives the same result as stepping a pixel at a time and stopping
+        before the first step that leaves the playfield or enters a wall.
+        
+        Returns:
+            Tuple of (steps taken, whether the move was blocked)
+        """
+        if speed <= 0:
+            return 0, False
+        if dx == 0 and dy == 1:
+            if x < MIN_X or x > MAX_X:
+                return 0, True
+            row_y = min(max(y // GRID_BLOCK_SIZE, 0), NUM_ROWS - 1)
+            stop = self.down_stop[(x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE][row_y]
+            if y + speed <= stop:
+                return speed, False
+            return max(stop - y, 0), True
+        if dx == 0 and dy == -1:
+            # Moving up never hits a block, only the playfield edges
+            if x < MIN_X or x > MAX_X:
+                return 0, True
+            return speed, False
+        if dy == 0 and dx == 1:
+            if x + 1 < MIN_X or x >= MAX_X:
+                return 0, True
+            stop = self._row_table(self.right_stop, y)[(x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE]
+            if x + speed <= stop:
+                return speed, False
+            return max(stop - x, 0), True
+        if dy == 0 and dx == -1:
+            if x <= MIN_X or x - 1 > MAX_X:
+                return 0, True
+            stop = self._row_table(self.left_stop, y)[(x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE]
+            if x - speed >= stop:
+                return speed, False
+            return max(x - stop, 0), True
+        return self._step(x, y, dx, dy, speed)
+    
+    def _row_table(self, tables, y):
+        # Rows off the grid have no blocks, the same as row 0
+        row_y = y // GRID_BLOCK_SIZE
+        if 0 <= row_y < NUM_ROWS:
+            return tables[row_y]
+        return tables[0]
+    
+    def _step(self, x, y, dx, dy, speed):
+        """Pixel-by-pixel reference used for moves the tables don't cover."""
+        for i in range(speed):
+            x, y = x + dx, y + dy
+            if x < MIN_X or x > MAX_X:
+                return i, True
+            if ((dy > 0 and y % GRID_BLOCK_SIZE == 0 or
+                 dx > 0 and x % GRID_BLOCK_SIZE == 0 or
+                 dx < 0 and x % GRID_BLOCK_SIZE == GRID_BLOCK_SIZE-1)
+                and self.is_solid((x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE, y // GRID_BLOCK_SIZE)):
+                    return i, True
+        return speed, False
+
+
+def compile_level(grid):
+    """Return the CompiledLevel for a grid, compiling each layout only once."""
+    key = tuple(grid)
+    level = _compiled.get(key)
+    if level is None:
+        level = CompiledLevel(grid)
+        _compiled[key] = level
+        if len(_compiled) > MAX_COMPILED:
+            _compiled.popitem(last=False)
+    else:
+        _compiled.move_to_end(key)
+    return level
@@ -0,0 +1,309 @@
+"""Level packs: a text format for writing levels and a binary one for playing them.
+
+Levels are written as text (see levels/classic.txt for the format) and
+compiled into a binary pack of fixed-size records, one per level:
+- the 28x18 block mask, one bit per cell
+- the level's enemy count, aggressive enemy count and colour
+
+The binary pack is memory-mapped rather than read, and a level is only
+decoded when it is played. Finding level n is a multiplication, so opening
+a pack of thousands of levels costs no more time or memory than opening
+one of three.
+
+load_pack() accepts either form. A text pack is compiled into .cache/ the
+first time it is loaded, and again whenever it changes.
+
+Usage:
+    python -m src.levelpack levels/classic.txt -o classic.lvl
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.level import NUM_COLUMNS, NUM_ROWS
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVELS_DIR = os.path.join(GAME_DIR, "levels")
+CACHE_DIR = os.path.join(GAME_DIR, ".cache")
+DEFAULT_PACK = os.path.join(LEVELS_DIR, "classic.txt")
+
+MAGIC = b"CAVLVL"
+VERSION = 1
+
+# Magic, version, number of levels
+HEADER = struct.Struct(">6sBI")
+
+# Block mask, then enemies, aggressive enemies and colour; -1 means default
+MASK_BYTES = (NUM_ROWS * NUM_COLUMNS + 7) // 8
+RECORD = struct.Struct(">%dshhb" % MASK_BYTES)
+
+# Rows written in the text format; the last row repeats the first
+TEXT_ROWS = NUM_ROWS - 1
+
+# Allowed range of each setting
+SETTINGS = {"enemies": (1, 1000), "aggressive": (0, 1000), "colour": (0, 3)}
+
+
+@dataclass(frozen=True)
+class LevelInfo:
+    """One decoded level."""
+    grid: Tuple[str, ...]               # NUM_ROWS strings, ' ' for empty
+    enemies: Optional[int] = None       # None: use the default progression
+    aggressive: Optional[int] = None
+    colour: Optional[int] = None
+
+
+def parse_pack(text, source="<pack>"):
+    """Parse a text level pack.
+    
+    Args:
+        text: Contents of the pack
+        source: Name used in error messages
+    
+    Returns:
+        List of LevelInfo
+    
+    Raises:
+        ValueError: If the text is not a valid pack
+    """
+    levels = []
+    rows = settings = None
+    
+    def finish(line_number):
+        if rows is None:
+            return
+        if len(rows) != TEXT_ROWS:
+            raise ValueError(f"{source}:{line_number}: level {len(levels) + 1} has {len(rows)} rows, "
+                             f"expected {TEXT_ROWS}")
+        grid = tuple(row.replace(".", " ") for row in rows + [rows[0]])
+        levels.append(LevelInfo(grid, **settings))
+    
+    lines = text.splitlines()
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        words = line.split()
+        if words == ["level"]:
+            finish(line_number)
+            rows, settings = [], {}
+        elif rows is None:
+            raise ValueError(f"{source}:{line_number}: expected 'level'")
+        elif words[0] in SETTINGS and len(words) == 2 and not rows:
+            low, high = SETTINGS[words[0]]
+            if not (words[1].isdigit() and low <= int(words[1]) <= high):
+                raise ValueError(f"{source}:{line_number}: {words[0]} must be from {low} to {high}")
+            settings[words[0]] = int(words[1])
+        elif len(line) == NUM_COLUMNS and set(line) <= {"X", "."}:
+            rows.append(line)
+        else:
+            raise ValueError(f"{source}:{line_number}: expected a setting or a row of "
+                             f"{NUM_COLUMNS} 'X' and '.' cells")
+    finish(len(lines) + 1)
+    if not levels:
+        raise ValueError(f"{source}: no levels")
+    return levels
+
+
+def encode_level(info):
+    """Pack a LevelInfo into one binary record."""
+    bits = int("".join(info.grid).replace(" ", "0").replace("X", "1"), 2)
+    mask = (bits << (MASK_BYTES * 8 - NUM_ROWS * NUM_COLUMNS)).to_bytes(MASK_BYTES, "big")
+    return RECORD.pack(mask, *(-1 if value is None else value
+                               for value in (info.enemies, info.aggressive, info.colour)))
+
+
+def decode_level(record):
+    """Unpack a binary record into a LevelInfo."""
+    mask, *settings = RECORD.unpack(record)
+    bits = int.from_bytes(mask, "big") >> (MASK_BYTES * 8 - NUM_ROWS * NUM_COLUMNS)
+    text = format(bits, "0%db" % (NUM_ROWS * NUM_COLUMNS)).replace("0", " ").replace("1", "X")
+    grid = tuple(text[row * NUM_COLUMNS:(row + 1) * NUM_COLUMNS] for row in range(NUM_ROWS))
+    return LevelInfo(grid, *(None if value < 0 else value for value in settings))
+
+
+def compile_pack(levels, path):
+    """Write levels as a binary pack, replacing any existing file atomically.
+    
+    Each call writes its own temporary file first, so processes compiling
+    the same pack at once can't interleave their writes.
+    """
+    # Only needed when compiling, so kept off the game's import path
+    import tempfile
+    directory, name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(dir=directory or ".", prefix=name + ".", suffix=".tmp",
+                                     delete=False) as f:
+        try:
+            f.write(HEADER.pack(MAGIC, VERSION, len(levels)))
+            for info in levels:
+                f.write(encode_level(info))
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+class LevelPack:
+    """Memory-mapped binary level pack, decoding levels as they are asked for."""
+    
+    def __init__(self, path):
+        """Open a binary pack.
+        
+        Raises:
+            ValueError: If the file is not a pack this version can read
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a Cavern level pack")
+        magic, version, self.count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Cavern level pack")
+        if len(self._map) < HEADER.size + self.count * RECORD.size:
+            raise ValueError(f"{path} is truncated")
+        # Only the most recently asked for level is kept decoded
+        self._index = None
+        self._level = None
+    
+    def __len__(self):
+        return self.count
+    
+    def level(self, index):
+        """The LevelInfo of level index, counting from 0.
+        
+        Raises:
+            IndexError: If there is no such level
+        """
+        if index != self._index:
+            if not 0 <= index < self.count:
+                raise IndexError(f"level {index} is not in a pack of {self.count}")
+            offset = HEADER.size + index * RECORD.size
+            self._level = decode_level(self._map[offset:offset + RECORD.size])
+            self._index = index
+        return self._level
+    
+    def close(self):
+        self._map.close()
+
+
+def _cache_prefix(path):
+    """Start of the name of every compiled copy of a text pack.
+    
+    It holds a hash of the pack's absolute path, so packs with the same
+    file name in different directories each have their own cache slot.
+    """
+    source = os.path.abspath(path)
+    name = os.path.splitext(os.path.basename(source))[0]
+    return "levels-%s-%s-" % (name, hashlib.sha1(source.encode()).hexdigest()[:8])
+
+
+def compiled_path(path, cache_dir=CACHE_DIR):
+    """Where load_pack() keeps the compiled form of a text pack."""
+    info = os.stat(path)
+    key = hashlib.sha1(b"%d %s %d %d" % (VERSION, os.path.abspath(path).encode(),
+                                         info.st_size, info.st_mtime_ns)).hexdigest()[:16]
+    return os.path.join(cache_dir, "%s%s.bin" % (_cache_prefix(path), key))
+
+
+def load_pack(path=DEFAULT_PACK, cache_dir=CACHE_DIR):
+    """Open a level pack, compiling a text pack into cache_dir if needed.
+    
+    Args:
+        path: Binary pack, or text pack ending in .txt
+        cache_dir: Directory for compiled text packs
+    
+    Raises:
+        ValueError: If the pack is not valid
+    """
+    if not path.endswith(".txt"):
+        return LevelPack(path)
+    
+    compiled = compiled_path(path, cache_dir)
+    if not os.path.exists(compiled):
+        with open(path) as f:
+            levels = parse_pack(f.read(), path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Drop the compiled copies of earlier versions of this pack file,
+            # and only this one. Another process may have compiled the
+            # current version meanwhile, or removed an old one first.
+            stale = re.compile(re.escape(_cache_prefix(path)) + r"[0-9a-f]{16}\.bin")
+            for old in os.listdir(cache_dir):
+                if stale.fullmatch(old) and old != os.path.basename(compiled):
+                    try:
+                        os.remove(os.path.join(cache_dir, old))
+                    except FileNotFoundError:
+                        pass
+            compile_pack(levels, compiled)
+        except OSError as e:
+            # Can't cache: compile somewhere temporary instead
+            print("Could not cache level pack:", e)
+            import tempfile
+            compiled = os.path.join(tempfile.mkdtemp(), os.path.basename(compiled))
+            compile_pack(levels, compiled)
+    pack = LevelPack(compiled)
+    pack.path = path
+    return pack
+
+
+def relative_path(path):
+    """A pack path as recordings store it: relative to the game directory.
+    
+    Packs inside the game directory are given with / separators, so the
+    path still resolves after the game is moved or on another machine.
+    Packs elsewhere keep their absolute path.
+    """
+    path = os.path.abspath(path)
+    if os.path.commonpath([path, GAME_DIR]) != GAME_DIR:
+        return path
+    return os.path.relpath(path, GAME_DIR).replace(os.sep, "/")
+
+
+def resolve_path(path):
+    """The file a path from relative_path() names, in this copy of the game."""
+    return os.path.join(GAME_DIR, os.path.normpath(path))
+
+
+_default = None
+
+
+def default_pack():
+    """The shipped pack, opened once per process."""
+    global _default
+    if _default is None:
+        _default = load_pack()
+    return _default
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile a Cavern text level pack.")
+    parser.add_argument("source", help="text level pack")
+    parser.add_argument("-o", "--out", help="binary pack to write (default: source with .lvl)")
+    args = parser.parse_args(argv)
+    
+    out = args.out or os.path.splitext(args.source)[0] + ".lvl"
+    start = time.perf_counter()
+    with open(args.source) as f:
+        levels = parse_pack(f.read(), args.source)
+    compile_pack(levels, out)
+    elapsed = time.perf_counter() - start
+    print(f"{len(levels)} levels, {os.path.getsize(out)} bytes, compiled in {elapsed * 1000:.1f} ms")
+    
+    start = time.perf_counter()
+    pack = LevelPack(out)
+    pack.level(len(pack) - 1)
+    elapsed = time.perf_counter() - start
+    print(f"Opened and decoded the last level in {elapsed * 1000:.2f} ms")
+    pack.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Platform navigation graph for robot steering.
+
+A compiled level is reduced to the platforms an actor can stand on and the
+ways a robot gets from one to another:
+- walking along a platform, until it meets a wall or a drop
+- walking off either end of a platform and falling onto the one below
+- falling out of the bottom of the screen, which brings an actor back in at
+  the top of the same column and onto the first platform there
+
+Robots never jump, as their only vertical speed is gravity, so those are all
+the edges there are. A breadth-first search from every platform fills a
+table of which way to walk to reach each other one. Like the collision maps,
+the graph is built once per layout, so a robot's steering decision is two
+table lookups and costs the same however many robots there are.
+
+Usage (build time and decision cost against enemy count):
+    python -m src.navigation --robots 10 100 1000 10000
+"""
+import random
+import time
+from collections import OrderedDict, deque
+
+from src.entities.base import sign
+from src.level import GRID_BLOCK_SIZE, LEVEL_X_OFFSET, NO_FLOOR, NUM_COLUMNS, NUM_ROWS, compile_level
+from src.levelpack import default_pack
+
+# Graphs of the most recently used layouts, least recent first
+MAX_GRAPHS = 8
+_graphs = OrderedDict()
+
+
+class NavGraph:
+    """Platforms of a compiled level and the direction to walk between them."""
+    
+    def __init__(self, level_map):
+        """Build the graph and its next-step table.
+        
+        Args:
+            level_map: CompiledLevel of the layout
+        """
+        def standable(col, row_y):
+            return level_map.is_solid(col, row_y) and not level_map.is_solid(col, row_y - 1)
+        
+        # Platforms as (row, first column, last column), where row is the row
+        # of the blocks walked on
+        self.platforms = []
+        platform_at = [-1] * (NUM_ROWS * NUM_COLUMNS)
+        for row_y in range(1, NUM_ROWS):
+            col = 0
+            while col < NUM_COLUMNS:
+                if standable(col, row_y):
+                    first = col
+                    while col + 1 < NUM_COLUMNS and standable(col + 1, row_y):
+                        col += 1
+                    for c in range(first, col + 1):
+                        platform_at[row_y * NUM_COLUMNS + c] = len(self.platforms)
+                    self.platforms.append((row_y, first, col))
+                col += 1
+        
+        # Platform an actor in each cell lands on, following it out of the
+        # bottom of the screen and back in at the top if need be
+        self.below = [-1] * (NUM_ROWS * NUM_COLUMNS)
+        for col in range(NUM_COLUMNS):
+            down = level_map.down_stop[col]
+            for row_y in range(NUM_ROWS):
+                floor_y = down[row_y] if down[row_y] != NO_FLOOR else down[0]
+                if floor_y != NO_FLOOR:
+                    landing_row = (floor_y + 1) // GRID_BLOCK_SIZE
+                    self.below[row_y * NUM_COLUMNS + col] = platform_at[landing_row * NUM_COLUMNS + col]
+        
+        # (direction, platform) reached by walking off each end; a wall or
+        # the edge of the playfield leaves no edge
+        self.edges = []
+        for row_y, first, last in self.platforms:
+            edges = []
+            for direction, col in ((-1, first - 1), (1, last + 1)):
+                if 0 <= col < NUM_COLUMNS and not level_map.is_solid(col, row_y - 1):
+                    target = self.below[(row_y - 1) * NUM_COLUMNS + col]
+                    if target >= 0:
+                        edges.append((direction, target))
+            self.edges.append(edges)
+        
+        # next_step[from * count + to]: way to walk first on a shortest route,
+        # or 0 when it is the same platform or there is no route
+        count = len(self.platforms)
+        self.next_step = [0] * (count * count)
+        for source in range(count):
+            row = source * count
+            seen = {source}
+            queue = deque()
+            for direction, target in self.edges[source]:
+                if target not in seen:
+                    seen.add(target)
+                    self.next_step[row + target] = direction
+                    queue.append(target)
+            while queue:
+                node = queue.popleft()
+                for _, target in self.edges[node]:
+                    if target not in seen:
+                        seen.add(target)
+                        self.next_step[row + target] = self.next_step[row + node]
+                        queue.append(target)
+    
+    def platform_below(self, x, y):
+        """Index of the platform an actor anchored at (x, y) stands or will land on, or -1."""
+        col = (x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE
+        col = 0 if col < 0 else NUM_COLUMNS - 1 if col >= NUM_COLUMNS else col
+        # Above the grid is the same as row 0, and below it falls back in there
+        row_y = y // GRID_BLOCK_SIZE
+        if not 0 <= row_y < NUM_ROWS:
+            row_y = 0 if row_y < 0 else NUM_ROWS - 1
+        return self.below[row_y * NUM_COLUMNS + col]
+    
+    def direction(self, from_x, from_y, to_x, to_y):
+        """Way to walk from one actor's position to reach another's platform.
+        
+        Returns:
+            -1 or 1, or 0 if both are over the same platform or there is no route
+        """
+        source = self.platform_below(from_x, from_y)
+        target = self.platform_below(to_x, to_y)
+        if source < 0 or target < 0:
+            return 0
+        return self.next_step[source * len(self.platforms) + target]
+
+
+def navigation_graph(level_map):
+    """Return the NavGraph for a CompiledLevel, building it only once."""
+    graph = _graphs.get(level_map)
+    if graph is None:
+        graph = _graphs[level_map] = NavGraph(level_map)
+        if len(_graphs) > MAX_GRAPHS:
+            _graphs.popitem(last=False)
+    else:
+        _graphs.move_to_end(level_map)
+    return graph
+
+
+def decision_time(graph, robots, repeats, seed):
+    """Nanoseconds per steering decision, with and without the graph.
+    
+    Args:
+        graph: NavGraph of the layout
+        robots: Number of robots deciding, each over a random platform
+        repeats: Times every robot decides
+        seed: Seed for placing the robots and player
+    
+    Returns:
+        Tuple of (graph ns, old sign-only ns) per decision
+    """
+    layout = random.Random(seed)
+    
+    def on_platform():
+        row_y, first, last = layout.choice(graph.platforms)
+        return (LEVEL_X_OFFSET + layout.randint(first, last) * GRID_BLOCK_SIZE + GRID_BLOCK_SIZE // 2,
+                row_y * GRID_BLOCK_SIZE - 1)
+    
+    positions = [on_platform() for _ in range(robots)]
+    player_x, player_y = on_platform()
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for x, y in positions:
+            graph.direction(x, y, player_x, player_y) or sign(player_x - x)
+    steer = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for x, y in positions:
+            sign(player_x - x)
+    old = time.perf_counter() - start
+    return steer / (robots * repeats) * 1e9, old / (robots * repeats) * 1e9
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark Cavern's robot navigation graph.")
+    parser.add_argument("--robots", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="robot counts to time decisions for")
+    parser.add_argument("--decisions", type=int, default=100000,
+                        help="decisions to time at each count")
+    parser.add_argument("--seed", type=int, default=1, help="seed for placing robots")
+    args = parser.parse_args(argv)
+    
+    pack = default_pack()
+    graphs = []
+    for index in range(len(pack)):
+        level_map = compile_level(pack.level(index).grid)
+        start = time.perf_counter()
+        graph = NavGraph(level_map)
+        elapsed = time.perf_counter() - start
+        routes = sum(step != 0 for step in graph.next_step)
+        print(f"Level {index + 1}: {len(graph.platforms)} platforms, "
+              f"{sum(map(len, graph.edges))} edges, {routes} routes, built in {elapsed * 1000:.2f} ms")
+        graphs.append(graph)
+    
+    print(f"{'robots':>7} {'graph ns':>9} {'old ns':>7}")
+    for robots in args.robots:
+        repeats = max(args.decisions // robots, 1)
+        steer = old = 0.0
+        for graph in graphs:
+            graph_ns, old_ns = decision_time(graph, robots, repeats, args.seed)
+            steer += graph_ns / len(graphs)
+            old += old_ns / len(graphs)
+        print(f"{robots:>7} {steer:>9.1f} {old:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Opt-in per-frame profiler.
+
+Hot paths hold a reference to the profiler, which is None unless profiling
+was requested (python main.py --profile), so the only cost when it is off
+is one attribute check per instrumented section. Samples go into fixed-size
+ring buffers that give rolling p50/p95/p99 figures for an on-screen overlay
+and a JSON dump at exit.
+"""
+import json
+import time
+from array import array
+
+from src.entities.base import CollideActor
+from src.entities.draw_utils import draw_text
+
+# Sections in overlay order, with the labels shown on screen
+OVERLAY_SECTIONS = [
+    ("app.update", "APP UPDATE"),
+    ("app.draw", "APP DRAW"),
+    ("game.update", "GAME UPDATE"),
+    ("update.player", "PLAYER"),
+    ("update.enemies", "ENEMIES"),
+    ("update.orbs", "ORBS"),
+    ("update.bolts", "BOLTS"),
+    ("update.pops", "POPS"),
+    ("update.fruits", "FRUITS"),
+    ("game.draw", "GAME DRAW"),
+    ("draw_status", "STATUS"),
+]
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent samples."""
+    
+    def __init__(self, size):
+        self._samples = array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0
+    
+    def add(self, value):
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+    
+    def percentiles(self, *ranks):
+        """Nearest-rank percentiles of the buffered samples."""
+        filled = min(self.count, len(self._samples))
+        if filled == 0:
+            return [0.0] * len(ranks)
+        ordered = sorted(self._samples[:filled])
+        return [ordered[min(filled - 1, int(rank / 100 * filled))] for rank in ranks]
+
+
+class Profiler:
+    """Collects section timings and per-frame counters."""
+    
+    WINDOW = 600           # Samples kept per section, 10 s at 60 ticks/s
+    OVERLAY_REFRESH = 30   # Frames between overlay text updates
+    
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.sections = {}
+        self.counters = {}
+        self.move_calls = 0
+        self.overlay_visible = False
+        self._overlay_lines = []
+        self._overlay_age = 0
+        self._original_move = None
+    
+    def record(self, name, seconds):
+        """Add a timing sample for a section."""
+        buffer = self.sections.get(name)
+        if buffer is None:
+            buffer = self.sections[name] = RingBuffer(self.window)
+        buffer.add(seconds)
+    
+    def lap(self, name, start):
+        """Record the time since start for a section and return the current time."""
+        now = time.perf_counter()
+        self.record(name, now - start)
+        return now
+    
+    def record_count(self, name, value):
+        """Add a per-frame counter sample."""
+        buffer = self.counters.get(name)
+        if buffer is None:
+            buffer = self.counters[name] = RingBuffer(self.window)
+        buffer.add(value)
+    
+    def end_tick(self):
+        """Close a simulation tick, sampling the CollideActor.move call count."""
+        self.record_count("move_calls", self.move_calls)
+        self.move_calls = 0
+    
+    def instrument_moves(self):
+        """Count CollideActor.move calls by wrapping the method.
+        
+        The wrapper is only installed while profiling, so the normal build
+        pays nothing for the counter.
+        """
+        if self._original_move is not None:
+            return
+        original = self._original_move = CollideActor.move
+        profiler = self
+        
+        def counted_move(actor, dx, dy, speed, level_map):
+            profiler.move_calls += 1
+            return original(actor, dx, dy, speed, level_map)
+        
+        CollideActor.move = counted_move
+    
+    def remove_instrumentation(self):
+        """Restore the original CollideActor.move."""
+        if self._original_move is not None:
+            CollideActor.move = self._original_move
+            self._original_move = None
+    
+    def summary(self):
+        """Percentiles for every section (in ms) and counter."""
+        result = {"sections": {}, "counters": {}}
+        for name, buffer in sorted(self.sections.items()):
+            p50, p95, p99 = buffer.percentiles(50, 95, 99)
+            result["sections"][name] = {
+                "samples": buffer.count,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+            }
+        for name, buffer in sorted(self.counters.items()):
+            p50, p95, p99 = buffer.percentiles(50, 95, 99)
+            result["counters"][name] = {"samples": buffer.count, "p50": p50, "p95": p95, "p99": p99}
+        return result
+    
+    def dump(self, path):
+        """Write summary() as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+    
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self._overlay_age = 0
+    
+    def draw_overlay(self, target):
+        """Draw p50/p95/p99 (microseconds) per section with draw_text.
+        
+        Args:
+            target: Screen or RenderQueue to draw onto
+        """
+        if not self.overlay_visible:
+            return
+        if self._overlay_age == 0:
+            self._overlay_lines = self._build_overlay_lines()
+        self._overlay_age = (self._overlay_age + 1) % Profiler.OVERLAY_REFRESH
+        
+        y = 4
+        for line in self._overlay_lines:
+            draw_text(target, line, y, 4)
+            y += 30
+    
+    def _build_overlay_lines(self):
+        # The font only has capitals, digits and spaces
+        lines = ["US P50 P95 P99"]
+        for name, label in OVERLAY_SECTIONS:
+            buffer = self.sections.get(name)
+            if buffer is not None:
+                values = buffer.percentiles(50, 95, 99)
+                lines.append(label + " " + " ".join(str(int(v * 1000000)) for v in values))
+        buffer = self.counters.get("move_calls")
+        if buffer is not None:
+            lines.append("MOVES " + " ".join(str(int(v)) for v in buffer.percentiles(50, 95, 99)))
+        buffer = self.counters.get("dirty_pixels")
+        if buffer is not None:
+            lines.append("DIRTY " + " ".join(str(int(v)) for v in buffer.percentiles(50, 95, 99)))
+        return lines
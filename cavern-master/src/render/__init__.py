@@ -0,0 +1 @@
+"""Rendering layer: turns simulation state into Pygame Zero blits."""
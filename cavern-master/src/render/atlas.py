@@ -0,0 +1,217 @@
+"""Startup image preloader with a packed atlas and an on-disk cache.
+
+Pygame Zero loads and decodes each PNG the first time it is drawn, so the
+first robot, pop, fruit or font glyph of a session used to cost a disk read
+mid-game. preload() instead loads every image the game draws up front:
+- the entity animation frames
+- the font and HUD images
+- the screens' images
+- the level tiles
+
+It packs them into a few atlas pages and installs a subsurface for each in
+the Pygame Zero image cache, so later images.load() calls never touch the
+disk.
+
+The packed pages are also saved under .cache/ as raw RGBA, keyed by the
+names, sizes and modification times of the source files. Later starts read
+them straight back without decoding any PNGs. A changed image changes the
+key, and the atlas is rebuilt.
+
+Usage (reports lazy, cold and warm load times):
+    python -m src.render.atlas
+"""
+import hashlib
+import json
+import os
+import struct
+import time
+from dataclasses import dataclass
+
+import pygame
+from pgzero.loaders import images
+
+# The entity modules build their animation tables, and so name their sprites, on import
+from src.entities import bolt, draw_utils, fruit, orb, player, pop, robot  # noqa: F401
+from src.render import level_layer
+from src.screens import game_over, menu
+from src.sprites import IMAGES_DIR, sprite_names
+
+GAME_DIR = os.path.dirname(IMAGES_DIR)
+CACHE_DIR = os.path.join(GAME_DIR, ".cache")
+
+# Bump when the packing or the file format changes
+ATLAS_VERSION = 1
+MAGIC = b"CAVATLAS"
+PAGE_WIDTH = 1024
+MAX_PAGE_HEIGHT = 1024
+
+
+@dataclass
+class AtlasStats:
+    """What preload() did and how long it took."""
+    images: int = 0
+    pages: int = 0
+    cold: bool = True       # Built from the PNGs rather than the cache
+    seconds: float = 0.0
+
+
+def sprite_manifest():
+    """Names of every image the game draws, without duplicates."""
+    names = sprite_names() + draw_utils.IMAGES + menu.IMAGES + game_over.IMAGES + level_layer.IMAGES
+    return list(dict.fromkeys(names))
+
+
+def cache_key(names):
+    """Digest of the atlas inputs: each image's name, size and mtime."""
+    digest = hashlib.sha1(b"%d %d %d" % (ATLAS_VERSION, PAGE_WIDTH, MAX_PAGE_HEIGHT))
+    for name in names:
+        info = os.stat(_image_path(name))
+        digest.update(b"%s %d %d\n" % (name.encode(), info.st_size, info.st_mtime_ns))
+    return digest.hexdigest()[:16]
+
+
+def pack(sizes):
+    """Shelf-pack rectangles into pages PAGE_WIDTH wide.
+    
+    Args:
+        sizes: Dict of name to (width, height)
+    
+    Returns:
+        Tuple of ({name: (page, x, y)}, [(page width, page height), ...])
+    """
+    placements = {}
+    pages = []
+    x = y = shelf_height = 0
+    # Tallest first keeps shelves tight; ties by name keep the layout stable
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], n)):
+        width, height = sizes[name]
+        if x + width > PAGE_WIDTH:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        if not pages or y + height > MAX_PAGE_HEIGHT:
+            pages.append(0)
+            x = y = shelf_height = 0
+        placements[name] = (len(pages) - 1, x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+        pages[-1] = max(pages[-1], y + shelf_height)
+    return placements, [(PAGE_WIDTH, page_height) for page_height in pages]
+
+
+def preload(cache_dir=CACHE_DIR):
+    """Load every image the game draws into the Pygame Zero image cache.
+    
+    Needs the display mode to be set. Reads the packed atlas from cache_dir
+    when it is up to date, otherwise builds it from the PNGs and saves it.
+    
+    Returns:
+        AtlasStats for the load
+    """
+    start = time.perf_counter()
+    names = sprite_manifest()
+    path = os.path.join(cache_dir, "atlas-%s.bin" % cache_key(names))
+    
+    stats = AtlasStats(images=len(names))
+    try:
+        pages, layout = _read(path)
+        stats.cold = False
+    except (OSError, ValueError, KeyError, pygame.error):
+        pages, layout = _build(names)
+        _write(path, pages, layout)
+    
+    for name in names:
+        page, x, y, width, height = layout[name]
+        surface = pages[page].subsurface((x, y, width, height))
+        images.cache[images.cache_key(name, (), {})] = surface
+    
+    stats.pages = len(pages)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _image_path(name):
+    return os.path.join(IMAGES_DIR, name + ".png")
+
+
+def _build(names):
+    # Converted as Pygame Zero does, which turns colour keys into alpha
+    loaded = {name: pygame.image.load(_image_path(name)).convert_alpha() for name in names}
+    placements, page_sizes = pack({name: surface.get_size() for name, surface in loaded.items()})
+    
+    pages = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+    for page in pages:
+        page.fill((0, 0, 0, 0))
+    layout = {}
+    for name, surface in loaded.items():
+        page, x, y = placements[name]
+        # Max-blending onto a cleared page copies the pixels, alpha included
+        pages[page].blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        layout[name] = (page, x, y) + surface.get_size()
+    return [page.convert_alpha() for page in pages], layout
+
+
+def _write(path, pages, layout):
+    """Save pages as raw RGBA after a JSON header; failures only cost the cache."""
+    header = json.dumps({"pages": [page.get_size() for page in pages], "layout": layout}).encode()
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for old in os.listdir(directory):
+            if old.startswith("atlas-") and old.endswith(".bin"):
+                os.remove(os.path.join(directory, old))
+        with open(path + ".tmp", "wb") as f:
+            f.write(MAGIC + struct.pack(">I", len(header)) + header)
+            for page in pages:
+                f.write(pygame.image.tostring(page, "RGBA"))
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print("Could not cache sprite atlas:", e)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a sprite atlas")
+    offset = len(MAGIC) + 4
+    (header_size,) = struct.unpack_from(">I", data, len(MAGIC))
+    header = json.loads(data[offset:offset + header_size])
+    offset += header_size
+    
+    pages = []
+    view = memoryview(data)
+    for width, height in header["pages"]:
+        size = width * height * 4
+        if offset + size > len(data):
+            raise ValueError("sprite atlas is truncated")
+        pages.append(pygame.image.frombuffer(view[offset:offset + size], (width, height), "RGBA").convert_alpha())
+        offset += size
+    return pages, {name: tuple(entry) for name, entry in header["layout"].items()}
+
+
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pgzero.loaders
+    pgzero.loaders.set_root(GAME_DIR)
+    pygame.display.init()
+    pygame.display.set_mode((800, 480))
+    
+    names = sprite_manifest()
+    start = time.perf_counter()
+    for name in names:
+        images.load(name)
+    lazy = time.perf_counter() - start
+    print(f"{len(names)} images loaded one by one: {lazy * 1000:.1f} ms")
+    
+    for old in os.listdir(CACHE_DIR) if os.path.isdir(CACHE_DIR) else []:
+        if old.startswith("atlas-"):
+            os.remove(os.path.join(CACHE_DIR, old))
+    for label in ("cold", "warm"):
+        images.cache.clear()
+        stats = preload()
+        state = "built and cached" if stats.cold else "read from cache"
+        print(f"Atlas {label}: {stats.pages} pages {state} in {stats.seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
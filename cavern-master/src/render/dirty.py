@@ -0,0 +1,207 @@
+"""Render queue that redraws and presents only the parts of the frame that changed.
+
+Each flush compares the frame's (surface, position) pairs with the previous
+frame's. A sprite that appeared, disappeared, moved or changed animation
+frame marks its old and new rectangles dirty. Overlapping dirty rectangles
+are merged, and within each one everything queued is redrawn, clipped to
+it, from the level layer up. The rest of the display keeps last frame's
+pixels, so a frame where nothing changed, such as a paused or game-over
+frame, draws nothing at all.
+
+Relies on the back layer covering the whole screen, as the level layer and
+the title images do, and on sprites that survive from one frame to the next
+keeping their relative draw order, which the entity lists do.
+
+Pygame Zero flips the whole display after every draw. DirtyPresenter takes
+the place of pygame.display.flip while dirty-rect rendering is on, and
+presents just the rects the frame changed.
+
+Usage (flush cost of full and dirty-rect frames, playing and paused):
+    python -m src.render.dirty --frames 600
+"""
+import os
+import time
+
+import pygame
+from pygame import Rect
+
+from src.render.queue import RenderQueue
+
+
+class DirtyRectQueue(RenderQueue):
+    """RenderQueue whose flush draws only the rectangles that changed."""
+    
+    def __init__(self):
+        super().__init__()
+        self._previous = {}
+        
+        # Rectangles changed by the most recent flush, for presenting
+        self.dirty = []
+        self.dirty_pixels = 0
+    
+    def flush(self, surface):
+        """Redraw the changed parts of the frame onto surface, and reset.
+        
+        Args:
+            surface: Target pygame Surface, holding the previous frame
+        
+        Returns:
+            List of the Rects that changed, for pygame.display.update()
+        """
+        batch = self._batch
+        for layer in self._layers:
+            batch.extend(layer)
+            layer.clear()
+        
+        # Rects keyed by (surface, position); a sprite drawn at the same place
+        # with the same frame as last time needs nothing done
+        current = {}
+        rects = []
+        for surface_pos in batch:
+            key = (surface_pos[0], tuple(surface_pos[1]))
+            rect = current.get(key)
+            if rect is None:
+                rect = current[key] = Rect(key[1], key[0].get_size())
+            rects.append(rect)
+        previous = self._previous
+        changed = [rect for key, rect in current.items() if key not in previous]
+        changed += [rect for key, rect in previous.items() if key not in current]
+        self._previous = current
+        
+        # Merge overlapping rects so no area is drawn twice
+        dirty = []
+        for rect in changed:
+            rect = rect.clip(surface.get_rect())
+            if not rect:
+                continue
+            hit = rect.collidelist(dirty)
+            while hit >= 0:
+                rect.union_ip(dirty.pop(hit))
+                hit = rect.collidelist(dirty)
+            dirty.append(rect)
+        
+        self.frames += 1
+        self.sprites = len(batch)
+        self.draw_calls = 0
+        self.dirty_pixels = 0
+        for rect in dirty:
+            surface.set_clip(rect)
+            surface.blits([batch[i] for i in rect.collidelistall(rects)], False)
+            self.draw_calls += 1
+            self.dirty_pixels += rect.width * rect.height
+        surface.set_clip(None)
+        batch.clear()
+        self.dirty = dirty
+        return dirty
+    
+    def invalidate(self):
+        """Make the next flush redraw everything, e.g. after the display was reset."""
+        self._previous = {}
+
+
+class DirtyPresenter:
+    """Stands in for pygame.display.flip, presenting only a frame's dirty rects.
+    
+    A flip that follows present() updates just the rects given to it. Any
+    other flip is passed to the real one, so code that relies on flip still
+    gets the whole display presented.
+    """
+    
+    def __init__(self):
+        self._flip = None
+        self._pending = None
+    
+    def install(self):
+        """Replace pygame.display.flip until remove() is called.
+        
+        Returns:
+            self, so the presenter can be created and installed in one line
+        """
+        if self._flip is None:
+            self._flip = pygame.display.flip
+            pygame.display.flip = self.flip
+        return self
+    
+    def remove(self):
+        if self._flip is not None:
+            pygame.display.flip = self._flip
+            self._flip = None
+    
+    def present(self, rects):
+        """Have the next flip update only these rects."""
+        self._pending = rects
+    
+    def flip(self):
+        rects, self._pending = self._pending, None
+        if rects is None:
+            self._flip()
+        elif rects:
+            pygame.display.update(rects)
+
+
+def frame_times(queue, frames, seed):
+    """Milliseconds per flush of a played and then paused game, and the dirty share.
+    
+    Args:
+        queue: RenderQueue or DirtyRectQueue to draw through
+        frames: Frames to play, then frames to stay paused for
+        seed: Seed for the game and its input
+    
+    Returns:
+        Tuple of (playing ms, paused ms, fraction of the screen redrawn)
+    """
+    from src.game import Game
+    from src.entities.draw_utils import draw_status
+    from src.entities.player import Player
+    from src.headless import KeyState, RandomPolicy
+    from src.input import InputManager
+    from src.render.game_renderer import GameRenderer
+    
+    surface = pygame.display.get_surface()
+    renderer = GameRenderer()
+    game = Game(player=Player(), seed=seed)
+    policy = RandomPolicy(seed)
+    keys = KeyState()
+    input_manager = InputManager()
+    pixels = 0
+    
+    def draw():
+        renderer.draw(queue, game)
+        draw_status(queue, game.player, game.level)
+        start = time.perf_counter()
+        queue.flush(surface)
+        return time.perf_counter() - start
+    
+    playing = 0.0
+    for frame in range(frames):
+        policy(frame, keys)
+        game.update(input_manager.capture_input(keys))
+        playing += draw()
+        pixels += getattr(queue, "dirty_pixels", surface.get_width() * surface.get_height())
+    paused = sum(draw() for _ in range(frames))
+    share = pixels / (frames * surface.get_width() * surface.get_height())
+    return playing / frames * 1000, paused / frames * 1000, share
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare full and dirty-rect frame drawing.")
+    parser.add_argument("--frames", type=int, default=600, help="frames to play, then to stay paused")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the game and its input")
+    args = parser.parse_args(argv)
+    
+    from src.render.atlas import GAME_DIR
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pgzero.loaders
+    pgzero.loaders.set_root(GAME_DIR)
+    pygame.display.init()
+    pygame.display.set_mode((800, 480))
+    
+    print(f"{'queue':>6} {'playing ms':>11} {'paused ms':>10} {'redrawn':>8}")
+    for name, queue in (("full", RenderQueue()), ("dirty", DirtyRectQueue())):
+        playing, paused, share = frame_times(queue, args.frames, args.seed)
+        print(f"{name:>6} {playing:>11.3f} {paused:>10.3f} {share:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
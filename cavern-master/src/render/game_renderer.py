@@ -0,0 +1,62 @@
+"""Renderer for the level and entities of a Game."""
+from time import perf_counter
+
+from pgzero.loaders import images
+
+from src.render.atlas import preload
+from src.render.level_layer import LevelLayerCache
+from src.render.queue import (LAYER_LEVEL, LAYER_FRUIT, LAYER_BOLT, LAYER_ENEMY,
+                              LAYER_POP, LAYER_ORB, LAYER_PLAYER)
+from src.sprites import bind_surfaces
+
+# Layer of each EntityRegistry group
+GROUP_LAYERS = {"fruits": LAYER_FRUIT, "bolts": LAYER_BOLT, "enemies": LAYER_ENEMY,
+                "pops": LAYER_POP, "orbs": LAYER_ORB}
+
+
+class GameRenderer:
+    """Submits a Game's level and entities to a RenderQueue.
+    
+    Kept separate from Game so the simulation can run without a display.
+    """
+    
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.level_layers = LevelLayerCache()
+        # Load every image before the menu's first frame, then resolve each
+        # entity animation frame to its surface
+        self.atlas_stats = preload()
+        bind_surfaces(images.load)
+    
+    def draw(self, queue, game):
+        """Queue the game state for drawing.
+        
+        Args:
+            queue: RenderQueue for the current frame
+            game: Game instance to draw
+        """
+        prof = self.profiler
+        if prof:
+            start = perf_counter()
+        
+        # Background and level blocks, rendered once per level
+        if game.level_layer is None:
+            self.prepare(game)
+        queue.submit(LAYER_LEVEL, game.level_layer, (0, 0))
+        
+        # Game objects, each list on its own layer
+        for name, objs in game.entities.groups():
+            self._submit_all(queue, GROUP_LAYERS[name], objs)
+        if game.player:
+            queue.submit(LAYER_PLAYER, game.player.sprite.surface, game.player.topleft)
+        
+        if prof:
+            prof.lap("game.draw", start)
+    
+    def prepare(self, game):
+        """Render the game's level layer now, ahead of its first frame."""
+        game.level_layer = self.level_layers.get(game.grid, game.level_colour)
+    
+    def _submit_all(self, queue, layer, objs):
+        for obj in objs:
+            queue.submit(layer, obj.sprite.surface, obj.topleft)
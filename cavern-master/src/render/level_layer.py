@@ -0,0 +1,55 @@
+"""Pre-rendered level layers.
+
+The background and block layout of a level never change while it is being
+played, so they are drawn once into an offscreen surface and blitted as a
+single image every frame.
+"""
+from collections import OrderedDict
+
+from pgzero.loaders import images
+
+from src.game import NUM_ROWS, LEVEL_X_OFFSET, GRID_BLOCK_SIZE
+
+NUM_COLOURS = 4
+
+# Background and block images for every level colour
+IMAGES = ["bg%d" % colour for colour in range(NUM_COLOURS)] + ["block%d" % colour for colour in range(NUM_COLOURS)]
+
+
+class LevelLayerCache:
+    """Small LRU cache of rendered level layers keyed by layout and colour."""
+    
+    MAX_LAYERS = 4
+    
+    def __init__(self, max_layers=MAX_LAYERS):
+        self.max_layers = max_layers
+        self._layers = OrderedDict()
+    
+    def get(self, grid, level_colour):
+        """Return the rendered layer for a level, building it on a miss.
+        
+        Args:
+            grid: Level grid (list of row strings)
+            level_colour: Index of the background and block sprites to use
+        """
+        key = (tuple(grid), level_colour)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = self._render(grid, level_colour)
+            self._layers[key] = layer
+            if len(self._layers) > self.max_layers:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return layer
+    
+    def _render(self, grid, level_colour):
+        layer = images.load("bg%d" % level_colour).copy()
+        block = images.load("block%d" % level_colour)
+        for row_y in range(NUM_ROWS):
+            x = LEVEL_X_OFFSET
+            for block_char in grid[row_y]:
+                if block_char != ' ':
+                    layer.blit(block, (x, row_y * GRID_BLOCK_SIZE))
+                x += GRID_BLOCK_SIZE
+        return layer.convert()
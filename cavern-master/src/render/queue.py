@@ -0,0 +1,60 @@
+"""Render queue batching a frame's sprites into one Surface.blits call."""
+from pgzero.loaders import images
+
+# Draw order, back to front
+LAYER_LEVEL = 0
+LAYER_FRUIT = 1
+LAYER_BOLT = 2
+LAYER_ENEMY = 3
+LAYER_POP = 4
+LAYER_ORB = 5
+LAYER_PLAYER = 6
+LAYER_HUD = 7
+NUM_LAYERS = 8
+
+
+class RenderQueue:
+    """Collects (surface, position) pairs per layer and submits them together.
+    
+    Offers the same blit(image, pos) call as the Pygame Zero screen, so text
+    and HUD helpers can draw into the queue unchanged. The per-layer lists
+    and the batch list are reused from frame to frame.
+    """
+    
+    def __init__(self):
+        self._layers = [[] for _ in range(NUM_LAYERS)]
+        self._batch = []
+        
+        # Statistics for the most recently flushed frame
+        self.frames = 0
+        self.sprites = 0
+        self.draw_calls = 0
+    
+    def submit(self, layer, surface, pos):
+        """Queue a surface to be drawn at pos on the given layer."""
+        self._layers[layer].append((surface, pos))
+    
+    def blit(self, image, pos, layer=LAYER_HUD):
+        """Queue an image by surface or Pygame Zero image name."""
+        if isinstance(image, str):
+            image = images.load(image)
+        self._layers[layer].append((image, pos))
+    
+    def flush(self, surface):
+        """Draw everything queued onto surface, back to front, and reset.
+        
+        Args:
+            surface: Target pygame Surface (the Pygame Zero screen's surface)
+        """
+        batch = self._batch
+        for layer in self._layers:
+            batch.extend(layer)
+            layer.clear()
+        
+        self.frames += 1
+        self.sprites = len(batch)
+        self.draw_calls = 0
+        if batch:
+            surface.blits(batch, False)
+            self.draw_calls = 1
+        batch.clear()
@@ -0,0 +1,232 @@
+"""Input recording and replay.
+
+A recording holds what is needed to play one game again: the Game's seed
+and difficulty, the InputState it consumed on every tick, and a hash of the
+game state after each tick. Replaying feeds the inputs back without a
+display as fast as the CPU allows and checks every hash, so a recorded
+session is both a repeatable benchmark and a regression test for the rules.
+
+Usage:
+    python3 main.py --record session.rec
+    python -m src.replay session.rec --repeat 5
+"""
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from src.game import Game
+from src.difficulty import DEFAULT, Difficulty
+from src.entities.player import Player
+from src.input import InputState
+from src.levelpack import DEFAULT_PACK, load_pack, relative_path, resolve_path
+
+MAGIC = b"CAVREC"
+# Version 2: positions are ints, which changes the state hashes
+# Version 3: robots steer by the navigation graph
+VERSION = 3
+
+# Magic, version, length of the JSON header that follows
+PREFIX = struct.Struct(">6sBI")
+
+# InputState fields packed into one byte per tick, lowest bit first
+INPUT_FIELDS = ("left", "right", "jump_pressed", "fire_pressed", "fire_held",
+                "pause_pressed", "menu_start", "overlay_pressed")
+
+# Level pack of recordings that don't name one
+DEFAULT_LEVELS = relative_path(DEFAULT_PACK)
+
+# Every possible InputState, indexed by its encoded byte
+DECODED_INPUTS = [InputState(**{name: bool(code >> bit & 1) for bit, name in enumerate(INPUT_FIELDS)})
+                  for code in range(1 << len(INPUT_FIELDS))]
+
+
+def encode_input(input_state):
+    """Pack an InputState into one byte."""
+    code = 0
+    for bit, name in enumerate(INPUT_FIELDS):
+        if getattr(input_state, name):
+            code |= 1 << bit
+    return code
+
+
+def state_hash(game):
+    """CRC32 of the game state the rules can observe."""
+    state = [game.timer, game.level, len(game.pending_enemies)]
+    player = game.player
+    if player:
+        state.append((player.x, player.y, player.sprite.name, player.vel_y, player.direction_x,
+                      player.lives, player.health, player.score, player.fire_timer, player.hurt_timer))
+    for _, objs in game.entities.groups():
+        state.append(len(objs))
+        for obj in objs:
+            state.append((obj.x, obj.y, obj.sprite.name))
+    return zlib.crc32(repr(state).encode())
+
+
+@dataclass
+class Recording:
+    """One recorded game."""
+    seed: int
+    difficulty: Difficulty
+    inputs: bytes   # One encoded InputState per tick
+    hashes: array   # state_hash() after each tick
+    levels: str = DEFAULT_LEVELS  # Level pack played, from relative_path()
+    
+    @property
+    def frames(self):
+        return len(self.inputs)
+    
+    def save(self, path):
+        """Write the recording: a small JSON header, then zlib-packed ticks."""
+        header = json.dumps({
+            "seed": self.seed,
+            "difficulty": asdict(self.difficulty),
+            "frames": self.frames,
+            "levels": self.levels,
+        }).encode()
+        hashes = array("I", self.hashes)
+        if sys.byteorder != "big":
+            hashes.byteswap()
+        with open(path, "wb") as f:
+            f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            f.write(zlib.compress(self.inputs + hashes.tobytes(), 9))
+    
+    @classmethod
+    def load(cls, path):
+        """Read a recording written by save().
+        
+        Raises:
+            ValueError: If the file is not a recording this version can read
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, header_size = PREFIX.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Cavern recording")
+        start = PREFIX.size
+        header = json.loads(data[start:start + header_size])
+        body = zlib.decompress(data[start + header_size:])
+        
+        frames = header["frames"]
+        hashes = array("I")
+        hashes.frombytes(body[frames:])
+        if sys.byteorder != "big":
+            hashes.byteswap()
+        if len(hashes) != frames:
+            raise ValueError(f"{path} is truncated")
+        return cls(header["seed"], Difficulty(**header["difficulty"]), body[:frames], hashes,
+                   header.get("levels", DEFAULT_LEVELS))
+
+
+class Recorder:
+    """Captures the inputs and state hashes of a game as it is played."""
+    
+    def __init__(self, path=None):
+        """Create a recorder.
+        
+        Args:
+            path: Default file for save()
+        """
+        self.path = path
+        self.seed = 0
+        self.difficulty = DEFAULT
+        self.levels = DEFAULT_LEVELS
+        self.inputs = bytearray()
+        self.hashes = array("I")
+    
+    def start(self, game):
+        """Begin recording a new game, discarding any previous one."""
+        self.seed = game.seed
+        self.difficulty = game.difficulty
+        self.levels = relative_path(game.level_pack.path)
+        self.inputs.clear()
+        self.hashes = array("I")
+    
+    def record(self, input_state, game):
+        """Record one tick, after game.update(input_state) has run."""
+        self.inputs.append(encode_input(input_state))
+        self.hashes.append(state_hash(game))
+    
+    def recording(self):
+        return Recording(self.seed, self.difficulty, bytes(self.inputs), array("I", self.hashes),
+                         self.levels)
+    
+    def save(self, path=None):
+        """Write the game recorded so far, if any ticks were recorded."""
+        if self.inputs:
+            self.recording().save(path or self.path)
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying a recording."""
+    frames: int = 0
+    elapsed: float = 0.0
+    mismatch: Optional[int] = None  # First tick whose state hash differed
+    
+    @property
+    def fps(self):
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def replay(recording, verify=True):
+    """Play a recording back as fast as possible.
+    
+    Args:
+        recording: Recording to play
+        verify: Check the state hash after every tick, stopping at the
+            first difference
+    
+    Returns:
+        ReplayResult with the ticks run and the first mismatch, if any
+    """
+    level_pack = load_pack(resolve_path(recording.levels))
+    game = Game(player=Player(), difficulty=recording.difficulty, seed=recording.seed, level_pack=level_pack)
+    hashes = recording.hashes
+    result = ReplayResult()
+    
+    start = time.perf_counter()
+    for frame, code in enumerate(recording.inputs):
+        game.update(DECODED_INPUTS[code])
+        result.frames += 1
+        if verify and state_hash(game) != hashes[frame]:
+            result.mismatch = frame
+            break
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Cavern game without a display.")
+    parser.add_argument("path", help="recording written by main.py --record")
+    parser.add_argument("--repeat", type=int, default=1, help="number of times to replay, for benchmarking")
+    parser.add_argument("--no-verify", action="store_true", help="skip the per-tick state hash checks")
+    args = parser.parse_args(argv)
+    
+    recording = Recording.load(args.path)
+    print(f"{recording.frames} ticks, seed {recording.seed}")
+    
+    best = None
+    for _ in range(args.repeat):
+        result = replay(recording, not args.no_verify)
+        if result.mismatch is not None:
+            print(f"State diverged at tick {result.mismatch}")
+            return 1
+        if best is None or result.elapsed < best.elapsed:
+            best = result
+    
+    if not args.no_verify:
+        print("All state hashes match")
+    print(f"Best of {args.repeat}: {best.elapsed:.3f}s, {best.fps:.0f} ticks/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
 """Game over screen implementation."""
+from time import perf_counter
+
 from src.entities.draw_utils import draw_status
+from src.screens import menu
+
+# Images drawn by this screen
+IMAGES = ["over"]
 
 
 class GameOverScreen:
@@ -27,16 +33,20 @@ class GameOverScreen:
         """
         if input_state.menu_start:
             # Return to menu
-            from src.screens.menu import MenuScreen
-            self.app.change_screen(MenuScreen(self.app))
+            self.app.change_screen(menu.MenuScreen(self.app))
     
     def draw(self):
         """Draw game over screen."""
         # Draw final game state
-        self.game.draw(self.app.screen)
+        self.app.renderer.draw(self.app.render_queue, self.game)
         
         # Draw status
-        draw_status(self.app.screen, self.game.player, self.game.level)
+        prof = self.app.profiler
+        if prof:
+            start = perf_counter()
+        draw_status(self.app.render_queue, self.game.player, self.game.level)
+        if prof:
+            prof.lap("draw_status", start)
         
         # Draw "Game Over" image
-        self.app.screen.blit("over", (0, 0))
+        self.app.render_queue.blit("over", (0, 0))
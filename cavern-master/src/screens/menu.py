@@ -1,6 +1,8 @@
 """Menu screen implementation."""
-from src.game import Game
-from src.entities.player import Player
+from src.screens import play
+
+# Images drawn by this screen
+IMAGES = ["title"] + ["space" + str(i) for i in range(10)]
 
 
 class MenuScreen:
@@ -14,11 +16,14 @@ class MenuScreen:
         """
         self.app = app
         self.game = None
+        self.play_prepared = False
     
     def on_enter(self):
         """Called when entering this screen."""
-        # Create a game without a player for menu animations
-        self.game = Game(player=None, sounds=self.app.sounds)
+        # The app's game without a player, restarted for the menu animations
+        self.game = self.app.menu_game
+        self.game.reset()
+        self.play_prepared = False
     
     def update(self, input_state):
         """Update menu screen.
@@ -27,21 +32,24 @@ class MenuScreen:
             input_state: InputState object with current frame's input
         """
         if input_state.menu_start:
-            # Start game - import here to avoid circular dependency
-            from src.screens.play import PlayScreen
-            self.app.change_screen(PlayScreen(self.app))
+            # Start game
+            self.app.change_screen(play.PlayScreen(self.app))
         else:
             # Update game timer for animations
             self.game.timer += 1
+            # Once the menu is up, ready the game SPACE will start
+            if not self.play_prepared:
+                self.app.prepare_play()
+                self.play_prepared = True
     
     def draw(self):
         """Draw menu screen."""
         # Draw game background
-        self.game.draw(self.app.screen)
+        self.app.renderer.draw(self.app.render_queue, self.game)
         
         # Draw title
-        self.app.screen.blit("title", (0, 0))
+        self.app.render_queue.blit("title", (0, 0))
         
         # Draw "Press SPACE" animation
         anim_frame = min(((self.game.timer + 40) % 160) // 4, 9)
-        self.app.screen.blit("space" + str(anim_frame), (130, 280))
+        self.app.render_queue.blit("space" + str(anim_frame), (130, 280))
@@ -1,7 +1,8 @@
 """Play screen implementation with pause support."""
-from src.game import Game
-from src.entities.player import Player
+from time import perf_counter
+
 from src.entities.draw_utils import draw_status, draw_text
+from src.screens import game_over
 
 
 class PlayScreen:
@@ -19,10 +20,11 @@ class PlayScreen:
     
     def on_enter(self):
         """Called when entering this screen."""
-        # Create new game with player
-        player = Player()
-        self.game = Game(player=player, sounds=self.app.sounds)
+        # The app's reusable game, usually prepared while the menu showed
+        self.game = self.app.start_play()
         self.paused = False
+        if self.app.recorder:
+            self.app.recorder.start(self.game)
     
     def update(self, input_state):
         """Update play screen.
@@ -37,23 +39,31 @@ class PlayScreen:
         # Only update game if not paused
         if not self.paused:
             self.game.update(input_state)
+            if self.app.recorder:
+                self.app.recorder.record(input_state, self.game)
             
             # Check for game over
             if self.game.player.lives < 0:
                 self.game.play_sound("over")
-                from src.screens.game_over import GameOverScreen
-                self.app.change_screen(GameOverScreen(self.app, self.game))
+                if self.app.recorder:
+                    self.app.recorder.save()
+                self.app.change_screen(game_over.GameOverScreen(self.app, self.game))
     
     def draw(self):
         """Draw play screen."""
         # Draw game
-        self.game.draw(self.app.screen)
+        self.app.renderer.draw(self.app.render_queue, self.game)
         
         # Draw status
-        draw_status(self.app.screen, self.game.player, self.game.level)
+        prof = self.app.profiler
+        if prof:
+            start = perf_counter()
+        draw_status(self.app.render_queue, self.game.player, self.game.level)
+        if prof:
+            prof.lap("draw_status", start)
         
         # Draw pause overlay if paused
         if self.paused:
             # Semi-transparent overlay effect - just draw text for simplicity
-            draw_text(self.app.screen, "PAUSED", 200)
-            draw_text(self.app.screen, "PRESS P TO RESUME", 250)
+            draw_text(self.app.render_queue, "PAUSED", 200)
+            draw_text(self.app.render_queue, "PRESS P TO RESUME", 250)
@@ -0,0 +1,313 @@
+"""Binary snapshots of a Game's state, and a ring buffer of them for rewinding.
+
+capture() packs everything the rules read into a few kilobytes:
+- the timer, level and pending enemies
+- the player and every robot, orb, bolt, pop and fruit
+- the random generator's state, which is most of the size
+
+restore() puts a game back exactly as it was, so a restored game plays on
+identically given the same inputs. Entities are rebuilt from the game's
+pools rather than copied.
+
+Snapshots are versioned. Sprites are stored as indices into the sprite
+table, so a snapshot also records a checksum of the table and is only
+restored by a build with the same sprites. The level layout comes from the
+game's own level pack.
+
+Usage (encode/decode throughput and a rewind check):
+    python -m src.snapshot --frames 3000 --seed 1
+"""
+import argparse
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from src.game import Game
+from src.entities.player import Player
+from src.headless import KeyState, RandomPolicy
+from src.input import InputManager
+from src.replay import state_hash
+from src.sprites import sprite_at, sprite_names
+
+MAGIC = b"CAVSNP"
+VERSION = 2
+
+# Magic, version, sprite table checksum
+HEADER = struct.Struct(">6sBI")
+
+# Timer, level, player present, then the number of pending enemies,
+# robots, orbs, bolts, pops and fruits
+GAME = struct.Struct(">iiBHHHHHH")
+
+# Every entity row starts with its integer x and y and its sprite index
+PLAYER = struct.Struct(">iiHh?biiiiih")
+ROBOT = struct.Struct(">iiHh?bbb?ii")
+ORB = struct.Struct(">iiHb?bii")
+BOLT = struct.Struct(">iiHb?")
+POP = struct.Struct(">iiHbi")
+FRUIT = struct.Struct(">iiHh?bi")
+
+# Random generator: internal state words, then the cached gauss value
+RNG_WORDS = 625
+GAUSS = struct.Struct(">?d")
+
+_sprite_table = (0, 0)
+
+
+def _sprite_checksum():
+    # Sprites are only ever added, so the checksum is redone when the count changes
+    global _sprite_table
+    names = sprite_names()
+    if _sprite_table[0] != len(names):
+        _sprite_table = (len(names), zlib.crc32(" ".join(names).encode()))
+    return _sprite_table[1]
+
+
+def capture(game):
+    """Snapshot a Game's state.
+    
+    Returns:
+        bytes for restore()
+    """
+    entities = game.entities
+    player = game.player
+    parts = [
+        HEADER.pack(MAGIC, VERSION, _sprite_checksum()),
+        GAME.pack(game.timer, game.level, player is not None, len(entities.pending_enemies),
+                  len(entities.enemies), len(entities.orbs), len(entities.bolts),
+                  len(entities.pops), len(entities.fruits)),
+        bytes(entities.pending_enemies),
+    ]
+    
+    if player is not None:
+        # An orb that has already popped is no longer blown, so it is left out
+        blowing = -1
+        if player.blowing_orb and player.blowing_orb in entities.orbs:
+            blowing = entities.orbs.index(player.blowing_orb)
+        parts.append(PLAYER.pack(player.x, player.y, player.sprite.index,
+                                 player.vel_y, player.landed, player.direction_x, player.fire_timer,
+                                 player.hurt_timer, player.health, player.lives, player.score, blowing))
+    for r in entities.enemies:
+        parts.append(ROBOT.pack(r.x, r.y, r.sprite.index, r.vel_y, r.landed, r.type,
+                                r.speed, r.direction_x, r.alive, r.change_dir_timer, r.fire_timer))
+    for o in entities.orbs:
+        trapped = -1 if o.trapped_enemy_type is None else o.trapped_enemy_type
+        parts.append(ORB.pack(o.x, o.y, o.sprite.index, o.direction_x, o.floating,
+                              trapped, o.timer, o.blown_frames))
+    for b in entities.bolts:
+        parts.append(BOLT.pack(b.x, b.y, b.sprite.index, b.direction_x, b.active))
+    for p in entities.pops:
+        parts.append(POP.pack(p.x, p.y, p.sprite.index, p.type, p.timer))
+    for f in entities.fruits:
+        parts.append(FRUIT.pack(f.x, f.y, f.sprite.index, f.vel_y, f.landed,
+                                f.type, f.timer))
+    
+    _, words, gauss = game.rng.getstate()
+    words = array("I", words)
+    if sys.byteorder != "big":
+        words.byteswap()
+    parts.append(words.tobytes())
+    parts.append(GAUSS.pack(gauss is not None, gauss or 0.0))
+    return b"".join(parts)
+
+
+def restore(game, data):
+    """Put a Game back into the state of a snapshot taken with capture().
+    
+    Raises:
+        ValueError: If the snapshot is from another version or sprite
+            table, or has a player where the game has none or vice versa
+    """
+    magic, version, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} Cavern snapshot")
+    if checksum != _sprite_checksum():
+        raise ValueError("snapshot was taken with a different sprite table")
+    offset = HEADER.size
+    timer, level, has_player, pending, robots, orbs, bolts, pops, fruits = GAME.unpack_from(data, offset)
+    offset += GAME.size
+    if has_player != (game.player is not None):
+        raise ValueError("snapshot and game differ in having a player")
+    
+    game.timer = timer
+    if level != game.level or game.level_map is None:
+        game.level = level
+        game.load_level()
+    entities = game.entities
+    entities.clear(data[offset:offset + pending])
+    offset += pending
+    
+    blowing = -1
+    if has_player:
+        player = game.player
+        (x, y, sprite, player.vel_y, player.landed, player.direction_x, player.fire_timer,
+         player.hurt_timer, player.health, player.lives, player.score, blowing) = PLAYER.unpack_from(data, offset)
+        player.x, player.y = x, y
+        player.sprite = sprite_at(sprite)
+        offset += PLAYER.size
+    
+    rng = game.rng
+    for row in _rows(ROBOT, data, offset, robots):
+        x, y, sprite, vel_y, landed, type, speed, direction_x, alive, change_dir_timer, fire_timer = row
+        r = entities.spawn_robot((x, y), type, rng)
+        r.sprite = sprite_at(sprite)
+        r.vel_y, r.landed, r.speed, r.direction_x, r.alive = vel_y, landed, speed, direction_x, alive
+        r.change_dir_timer, r.fire_timer = change_dir_timer, fire_timer
+    offset += ROBOT.size * robots
+    
+    for row in _rows(ORB, data, offset, orbs):
+        x, y, sprite, direction_x, floating, trapped, timer, blown_frames = row
+        o = entities.spawn_orb((x, y), direction_x)
+        o.sprite = sprite_at(sprite)
+        o.floating, o.timer, o.blown_frames = floating, timer, blown_frames
+        if trapped >= 0:
+            entities.trap(o, trapped)
+    offset += ORB.size * orbs
+    
+    for x, y, sprite, direction_x, active in _rows(BOLT, data, offset, bolts):
+        b = entities.spawn_bolt((x, y), direction_x)
+        b.sprite = sprite_at(sprite)
+        b.active = active
+    offset += BOLT.size * bolts
+    
+    for x, y, sprite, type, timer in _rows(POP, data, offset, pops):
+        p = entities.spawn_pop((x, y), type)
+        p.sprite = sprite_at(sprite)
+        p.timer = timer
+    offset += POP.size * pops
+    
+    for x, y, sprite, vel_y, landed, type, timer in _rows(FRUIT, data, offset, fruits):
+        f = entities.spawn_fruit((x, y), rng)
+        f.sprite = sprite_at(sprite)
+        f.vel_y, f.landed, f.type, f.timer = vel_y, landed, type, timer
+    offset += FRUIT.size * fruits
+    
+    if has_player:
+        game.player.blowing_orb = entities.orbs[blowing] if blowing >= 0 else None
+    
+    # Last, as rebuilding the robots and fruit drew from the generator
+    words = array("I")
+    words.frombytes(data[offset:offset + 4 * RNG_WORDS])
+    if sys.byteorder != "big":
+        words.byteswap()
+    has_gauss, gauss = GAUSS.unpack_from(data, offset + 4 * RNG_WORDS)
+    rng.setstate((3, tuple(words), gauss if has_gauss else None))
+    game.orb_grid.invalidate()
+
+
+def _rows(row_struct, data, offset, count):
+    return row_struct.iter_unpack(data[offset:offset + row_struct.size * count])
+
+
+class SnapshotRing:
+    """The last few seconds of a game as one snapshot per tick.
+    
+    Slots are reused in a fixed-size ring, like the profiler's sample
+    buffers, so keeping a history costs no allocation beyond the snapshots.
+    """
+    
+    CAPACITY = 300  # 5 s at 60 ticks/s
+    
+    def __init__(self, capacity=CAPACITY):
+        self._slots = [None] * capacity
+        self._next = 0
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def push(self, game):
+        """Snapshot the game after a tick, overwriting the oldest once full."""
+        self._slots[self._next] = capture(game)
+        self._next = (self._next + 1) % len(self._slots)
+        self.count = min(self.count + 1, len(self._slots))
+    
+    def peek(self, ticks=0):
+        """The snapshot from ticks before the newest, without removing anything."""
+        if not 0 <= ticks < self.count:
+            raise IndexError(f"only {self.count} snapshots are kept")
+        return self._slots[(self._next - 1 - ticks) % len(self._slots)]
+    
+    def rewind(self, game, ticks):
+        """Restore the game to ticks before the newest snapshot.
+        
+        The snapshots newer than the one restored are dropped, so play
+        continues from there.
+        
+        Returns:
+            The number of ticks actually rewound, limited by the history kept
+        """
+        ticks = min(ticks, self.count - 1)
+        if ticks < 0:
+            return 0
+        restore(game, self.peek(ticks))
+        self._next = (self._next - ticks) % len(self._slots)
+        self.count -= ticks
+        return ticks
+    
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Cavern snapshots and check rewinding.")
+    parser.add_argument("--frames", type=int, default=3000, help="ticks to play")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the game and its input")
+    parser.add_argument("--rewind", type=int, default=120, help="ticks to rewind and replay at the end")
+    args = parser.parse_args(argv)
+    
+    # Reference run, without snapshots
+    game = Game(player=Player(), seed=args.seed)
+    policy = RandomPolicy(args.seed)
+    keys = KeyState()
+    input_manager = InputManager()
+    inputs, hashes = [], []
+    for frame in range(args.frames):
+        policy(frame, keys)
+        input_state = input_manager.capture_input(keys)
+        game.update(input_state)
+        if game.player.lives < 0:
+            break
+        inputs.append(input_state)
+        hashes.append(state_hash(game))
+    ticks = len(inputs)
+    
+    # The same game, captured and restored from its snapshot after every tick
+    game = Game(player=Player(), seed=args.seed)
+    ring = SnapshotRing(max(args.rewind + 1, SnapshotRing.CAPACITY))
+    encode = decode = 0.0
+    size = 0
+    for frame, input_state in enumerate(inputs):
+        game.update(input_state)
+        start = time.perf_counter()
+        ring.push(game)
+        encode += time.perf_counter() - start
+        data = ring.peek()
+        size += len(data)
+        start = time.perf_counter()
+        restore(game, data)
+        decode += time.perf_counter() - start
+        if state_hash(game) != hashes[frame]:
+            print(f"State diverged at tick {frame} after restoring")
+            return 1
+    
+    print(f"{ticks} ticks, {size / ticks:.0f} bytes per snapshot on average")
+    print(f"capture {encode / ticks * 1e6:.1f} us, restore {decode / ticks * 1e6:.1f} us "
+          f"({size / encode / 1e6:.0f} MB/s encode, {size / decode / 1e6:.0f} MB/s decode)")
+    
+    # Rewinding and replaying the same inputs must reproduce the same states
+    rewound = ring.rewind(game, args.rewind)
+    for frame in range(ticks - rewound, ticks):
+        game.update(inputs[frame])
+        if state_hash(game) != hashes[frame]:
+            print(f"State diverged {frame - (ticks - rewound) + 1} ticks after rewinding")
+            return 1
+    print(f"Rewound {rewound} ticks and replayed them identically")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
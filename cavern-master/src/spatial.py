@@ -0,0 +1,100 @@
+"""Uniform-grid spatial hash used as a broadphase for entity interactions."""
+GRID_BLOCK_SIZE = 25
+
+# Cells span several level blocks so an orb-sized rect touches at most four
+CELL_SIZE = 4 * GRID_BLOCK_SIZE
+
+# Below this many actors a plain scan beats building the hash
+LINEAR_LIMIT = 8
+
+
+class SpatialHash:
+    """Buckets a list of actors by the grid cells their rects overlap.
+    
+    Cells are aligned to the level grid. Buckets keep insertion order, so
+    queries return candidates in the order a linear scan of the source
+    list would visit them in. The hash rebuilds itself lazily on the first
+    query after invalidate(), so frames with no queries cost nothing, and
+    small lists are simply scanned.
+    """
+    
+    def __init__(self, objs, cell_size=CELL_SIZE):
+        """Create a hash over a list of actors.
+        
+        Args:
+            objs: List of actors to index; it is read again on each rebuild
+            cell_size: Width and height of a cell in pixels
+        """
+        self.objs = objs
+        self.cell_size = cell_size
+        self._buckets = {}
+        self._used = []
+        self._order = {}
+        self._result = []
+        self._stale = True
+    
+    def invalidate(self):
+        """Mark the index out of date, e.g. after the actors have moved."""
+        self._stale = True
+    
+    def _rebuild(self):
+        for bucket in self._used:
+            bucket.clear()
+        self._used.clear()
+        self._order.clear()
+        
+        size = self.cell_size
+        buckets = self._buckets
+        for obj in self.objs:
+            left, top = obj.topleft
+            self._order[obj] = len(self._order)
+            for cell_y in range(int(top // size), int((top + obj.height) // size) + 1):
+                for cell_x in range(int(left // size), int((left + obj.width) // size) + 1):
+                    bucket = buckets.get((cell_x, cell_y))
+                    if bucket is None:
+                        bucket = buckets[(cell_x, cell_y)] = []
+                    if not bucket:
+                        self._used.append(bucket)
+                    bucket.append(obj)
+        self._stale = False
+    
+    def query_point(self, x, y):
+        """Actors whose cells contain the point, in insertion order.
+        
+        Every actor whose rect contains the point is included; callers
+        still do the exact test. The returned list must not be modified.
+        """
+        if len(self.objs) <= LINEAR_LIMIT:
+            return self.objs
+        if self._stale:
+            self._rebuild()
+        size = self.cell_size
+        return self._buckets.get((int(x // size), int(y // size)), ())
+    
+    def query_rect(self, left, top, right, bottom):
+        """Actors whose cells overlap the rect, once each, in insertion order.
+        
+        The returned list must not be modified and is only valid until the
+        next query.
+        """
+        if len(self.objs) <= LINEAR_LIMIT:
+            return self.objs
+        if self._stale:
+            self._rebuild()
+        size = self.cell_size
+        result = self._result
+        result.clear()
+        first_x, last_x = int(left // size), int(right // size)
+        first_y, last_y = int(top // size), int(bottom // size)
+        if len(self._order) <= (last_x - first_x + 1) * (last_y - first_y + 1):
+            # Fewer actors than cells to visit: every actor is a candidate
+            result.extend(self._order)
+            return result
+        for cell_y in range(first_y, last_y + 1):
+            for cell_x in range(first_x, last_x + 1):
+                bucket = self._buckets.get((cell_x, cell_y))
+                if bucket:
+                    result.extend(bucket)
+        if len(result) > 1:
+            result[:] = sorted(set(result), key=self._order.__getitem__)
+        return result
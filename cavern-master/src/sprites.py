@@ -0,0 +1,83 @@
+"""Sprite metadata shared by the simulation and the renderer.
+
+The simulation only needs to know how big each sprite is (actor rects are
+sized from their current image), so sizes are read straight from the PNG
+headers in images/ without loading pixels or needing a display. The
+renderer attaches the loaded surfaces to the same Sprite objects, so
+entities can keep prebuilt animation tables of Sprites and never look an
+image up by name while the game is running.
+"""
+import os
+import struct
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images")
+
+# Width and height are the first two fields of the IHDR chunk
+PNG_SIZE_OFFSET = 16
+
+_sizes = {}
+_sprites = {}
+_by_index = []
+_loader = None
+
+
+def sprite_size(name):
+    """Return (width, height) of the named sprite, reading it once from disk."""
+    size = _sizes.get(name)
+    if size is None:
+        with open(os.path.join(IMAGES_DIR, name + ".png"), "rb") as f:
+            header = f.read(PNG_SIZE_OFFSET + 8)
+        size = struct.unpack(">II", header[PNG_SIZE_OFFSET:])
+        _sizes[name] = size
+    return size
+
+
+class Sprite:
+    """A named image with its size and, once bound, its loaded surface."""
+    
+    __slots__ = ("name", "index", "width", "height", "surface")
+    
+    def __init__(self, name):
+        self.name = name
+        self.index = len(_by_index)
+        self.width, self.height = sprite_size(name)
+        self.surface = _loader(name) if _loader else None
+    
+    def __repr__(self):
+        return "Sprite(%r)" % self.name
+
+
+def get_sprite(name):
+    """Return the shared Sprite for an image name, creating it on first use."""
+    sprite = _sprites.get(name)
+    if sprite is None:
+        sprite = _sprites[name] = Sprite(name)
+        _by_index.append(sprite)
+    return sprite
+
+
+def sprite_at(index):
+    """The Sprite whose index attribute is index."""
+    return _by_index[index]
+
+
+def sprite_names():
+    """Names of every Sprite created so far, in creation order."""
+    return list(_sprites)
+
+
+def sprite_frames(prefix, *indices):
+    """Build a tuple of Sprites named prefix + index, e.g. ("run1", 0, 1)."""
+    return tuple(get_sprite(prefix + str(i)) for i in indices)
+
+
+def bind_surfaces(load):
+    """Attach surfaces to every Sprite, now and for Sprites created later.
+    
+    Args:
+        load: Callable taking an image name and returning a Surface
+    """
+    global _loader
+    _loader = load
+    for sprite in _sprites.values():
+        sprite.surface = load(sprite.name)
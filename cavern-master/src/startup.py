@@ -0,0 +1,112 @@
+"""Startup import profiler.
+
+ImportProfiler times every module loaded while it is installed, as
+python -X importtime does, but from inside the game, so a flag can switch it
+on and it can report once the first frame is up. For each module it gives:
+- cumulative time: loading and running the module, including the imports
+  it makes
+- self time: the same without those nested imports
+
+It hooks the import system's _load_unlocked step, which every first import
+of a module goes through. Modules that are already imported cost nothing
+and aren't reported.
+
+Usage:
+    python3 main.py --profile-startup
+    python -m src.startup src.app src.screens.menu
+"""
+import sys
+import time
+from importlib import _bootstrap
+
+# What main.py imports before its first frame
+DEFAULT_MODULES = ["pygame", "pgzero.loaders", "src.app", "src.screens.menu"]
+
+
+class ImportProfiler:
+    """Times module loads between install() and remove()."""
+    
+    # Top-level packages reported as groups; the rest are "other"
+    GROUPS = ("src", "pygame", "pgzero", "numpy", "pkg_resources")
+    
+    def __init__(self):
+        # (name, self seconds, cumulative seconds) in the order loads finished
+        self.modules = []
+        self.started = time.perf_counter()
+        self._original = None
+        # Time spent in nested loads, one entry per load in progress
+        self._nested = []
+    
+    def install(self):
+        """Start timing imports.
+        
+        Returns:
+            self, so the profiler can be created and installed in one line
+        """
+        if self._original is None:
+            self._original = original = _bootstrap._load_unlocked
+            nested, modules = self._nested, self.modules
+            
+            def timed_load(spec):
+                nested.append(0.0)
+                start = time.perf_counter()
+                try:
+                    return original(spec)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    children = nested.pop()
+                    if nested:
+                        nested[-1] += elapsed
+                    modules.append((spec.name, elapsed - children, elapsed))
+            
+            _bootstrap._load_unlocked = timed_load
+        return self
+    
+    def remove(self):
+        if self._original is not None:
+            _bootstrap._load_unlocked = self._original
+            self._original = None
+    
+    def group_times(self):
+        """Total self time of each group of modules, largest first."""
+        totals = {}
+        for name, own, _ in self.modules:
+            group = name.split(".")[0]
+            if group not in ImportProfiler.GROUPS:
+                group = "other"
+            totals[group] = totals.get(group, 0.0) + own
+        return sorted(totals.items(), key=lambda item: -item[1])
+    
+    def report(self, limit=20, file=None):
+        """Print the import time of each group and of the slowest modules.
+        
+        Args:
+            limit: Number of modules to list, slowest self time first
+            file: Stream to print to; stdout if None
+        """
+        file = file or sys.stdout
+        total = sum(own for _, own, _ in self.modules)
+        print(f"{len(self.modules)} modules imported in {total * 1000:.1f} ms", file=file)
+        for group, seconds in self.group_times():
+            print(f"  {group:<14} {seconds * 1000:8.1f} ms", file=file)
+        print(f"{'self ms':>9} {'cum ms':>8}  module", file=file)
+        for name, own, cumulative in sorted(self.modules, key=lambda module: -module[1])[:limit]:
+            print(f"{own * 1000:>9.1f} {cumulative * 1000:>8.1f}  {name}", file=file)
+
+
+def main(argv=None):
+    """Import the modules named on the command line, or the game's, and report.
+    
+    Arguments are read without argparse so that its import time still
+    counts for the modules that use it.
+    """
+    modules = (sys.argv[1:] if argv is None else argv) or DEFAULT_MODULES
+    profiler = ImportProfiler().install()
+    for module in modules:
+        __import__(module)
+    profiler.remove()
+    profiler.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""NumPy struct-of-arrays engine for player-less simulation.
+
+Game updates every robot, orb and bolt as a Python object, one at a time.
+VectorGame keeps those three kinds of entity in contiguous arrays instead,
+one column per field, so movement, gravity, timers, collision against the
+compiled level and despawning are done a whole list at a time. It is meant
+for stress and soak runs with far more entities than a real game has: it
+has no player and cannot be drawn.
+
+Results match Game with player=None tick for tick under the same seed. The
+random numbers are drawn from the same generator in the same order: only
+the robots that draw on a given tick are visited in Python, in list order,
+and everything else is array arithmetic. Fruit and pops stay ordinary
+pooled entities, as a level never has more than a handful.
+
+Needs NumPy, which the rest of the game does not.
+
+Usage:
+    python -m src.vectorized --entities 10 100 1000 10000 --frames 60
+"""
+import argparse
+import random
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.game import Game
+from src.difficulty import DEFAULT
+from src.entities.actor import BLANK
+from src.entities.base import GravityActor, HEIGHT
+from src.entities.bolt import Bolt
+from src.entities.orb import Orb
+from src.entities.robot import Robot
+from src.level import GRID_BLOCK_SIZE, LEVEL_X_OFFSET, MAX_X, MIN_X, NUM_COLUMNS, NUM_ROWS
+from src.spatial import CELL_SIZE
+
+# Every robot frame is the same height; a robot shows the blank sprite
+# until its first update
+ROBOT_HEIGHT = Robot.FRAMES[0][0][0].height
+
+ROBOT_DIRECTIONS = (-1, 1)
+
+# Orb sprite sizes by timer, as set at the end of Orb.update
+_orb_frames = [Orb.BLOWN_FRAMES[t // 3] if t < 9 else Orb.FLOAT_FRAMES[((t - 9) // 8) % 4]
+               for t in range(Orb.MAX_TIMER + 1)]
+ORB_WIDTH = np.array([sprite.width for sprite in _orb_frames])
+ORB_HEIGHT = np.array([sprite.height for sprite in _orb_frames])
+
+# Cell coordinates are packed into one sortable key
+_CELL_KEY_SHIFT = 1 << 32
+
+# Tables of the most recently used layouts, least recent first
+MAX_LEVEL_TABLES = 8
+_level_tables = OrderedDict()
+
+
+class LevelTables:
+    """A CompiledLevel's wall distance tables as NumPy arrays."""
+    
+    def __init__(self, level_map):
+        self.right_stop = np.array(level_map.right_stop)    # [row][column]
+        self.left_stop = np.array(level_map.left_stop)      # [row][column]
+        self.down_stop = np.array(level_map.down_stop)      # [column][row]
+    
+    def sweep_down(self, x, y, speed):
+        """CompiledLevel.sweep(x, y, 0, 1, speed) for arrays of actors."""
+        inside = (x >= MIN_X) & (x <= MAX_X) & (speed > 0)
+        col = np.clip((x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE, 0, NUM_COLUMNS - 1)
+        row = np.clip(y // GRID_BLOCK_SIZE, 0, NUM_ROWS - 1)
+        stop = self.down_stop[col, row]
+        free = y + speed <= stop
+        steps = np.where(free, speed, np.maximum(stop - y, 0))
+        return np.where(inside, steps, 0), ~inside | ~free
+    
+    def sweep_up(self, x, speed):
+        """CompiledLevel.sweep(x, y, 0, -1, speed) for arrays of actors."""
+        inside = (x >= MIN_X) & (x <= MAX_X)
+        return np.where(inside, speed, 0), ~inside
+    
+    def sweep_across(self, x, y, dx, speed):
+        """CompiledLevel.sweep(x, y, dx, 0, speed) with dx of -1 or 1 per actor."""
+        row = y // GRID_BLOCK_SIZE
+        row = np.where((row >= 0) & (row < NUM_ROWS), row, 0)
+        col = np.clip((x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE, 0, NUM_COLUMNS - 1)
+        right = dx > 0
+        
+        stop_right = self.right_stop[row, col]
+        stop_left = self.left_stop[row, col]
+        inside = np.where(right, (x + 1 >= MIN_X) & (x < MAX_X), (x > MIN_X) & (x - 1 <= MAX_X))
+        free = np.where(right, x + speed <= stop_right, x - speed >= stop_left)
+        room = np.where(right, stop_right - x, x - stop_left)
+        steps = np.where(free, speed, np.maximum(room, 0))
+        inside &= speed > 0
+        return np.where(inside, steps, 0), ~inside | ~free
+
+
+def level_tables(level_map):
+    """Return the LevelTables for a CompiledLevel, converting it only once."""
+    tables = _level_tables.get(level_map)
+    if tables is None:
+        tables = _level_tables[level_map] = LevelTables(level_map)
+        if len(_level_tables) > MAX_LEVEL_TABLES:
+            _level_tables.popitem(last=False)
+    else:
+        _level_tables.move_to_end(level_map)
+    return tables
+
+
+class EntityArrays:
+    """Growable set of columns sharing one row count.
+    
+    Rows 0..count-1 are live. Columns are read with column(name), which
+    returns a view that can be updated in place.
+    """
+    
+    INITIAL_CAPACITY = 64
+    
+    def __init__(self, **dtypes):
+        self.count = 0
+        self._columns = {name: np.zeros(EntityArrays.INITIAL_CAPACITY, dtype)
+                         for name, dtype in dtypes.items()}
+    
+    def column(self, name):
+        return self._columns[name][:self.count]
+    
+    def columns(self, *names):
+        return [self._columns[name][:self.count] for name in names]
+    
+    def extend(self, **values):
+        """Append rows; every column must be given, as scalars or equal-length arrays."""
+        added = max(np.size(value) for value in values.values())
+        if added == 0:
+            return
+        needed = self.count + added
+        capacity = len(next(iter(self._columns.values())))
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, column.dtype)
+                grown[:self.count] = column[:self.count]
+                self._columns[name] = grown
+        for name, value in values.items():
+            self._columns[name][self.count:needed] = value
+        self.count = needed
+    
+    def keep(self, mask):
+        """Drop the rows where mask is False, keeping the rest in order."""
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        for column in self._columns.values():
+            column[:kept] = column[:self.count][mask]
+        self.count = kept
+    
+    def clear(self):
+        self.count = 0
+    
+    def rows(self, *names):
+        """Live rows as tuples of Python values, for comparisons."""
+        return list(zip(*(self.column(name).tolist() for name in names)))
+
+
+def _cell_span(low, high):
+    return (np.floor_divide(low, CELL_SIZE).astype(np.int64),
+            np.floor_divide(high, CELL_SIZE).astype(np.int64))
+
+
+def _expand_cells(x0, x1, y0, y1):
+    """Every (owner, cell key) pair for owners covering cell ranges [x0, x1] x [y0, y1]."""
+    owners, keys = [], []
+    index = np.arange(len(x0))
+    for dy in range(int((y1 - y0).max(initial=0)) + 1):
+        for dx in range(int((x1 - x0).max(initial=0)) + 1):
+            covered = (x0 + dx <= x1) & (y0 + dy <= y1)
+            owners.append(index[covered])
+            keys.append((y0[covered] + dy) * _CELL_KEY_SHIFT + x0[covered] + dx)
+    return np.concatenate(owners), np.concatenate(keys)
+
+
+def _candidate_pairs(query_cells, item_cells):
+    """(query, item) pairs sharing at least one cell; may contain repeats.
+    
+    Both arguments are (x0, x1, y0, y1) cell ranges. Like SpatialHash this
+    is only a broadphase: callers apply the exact test.
+    """
+    item_owner, item_key = _expand_cells(*item_cells)
+    order = np.argsort(item_key, kind="stable")
+    item_owner, item_key = item_owner[order], item_key[order]
+    query_owner, query_key = _expand_cells(*query_cells)
+    
+    start = np.searchsorted(item_key, query_key, "left")
+    counts = np.searchsorted(item_key, query_key, "right") - start
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    offsets = np.repeat(start - np.cumsum(counts) + counts, counts)
+    return np.repeat(query_owner, counts), item_owner[np.arange(total) + offsets]
+
+
+def _first_match(num_queries, queries, items, hit):
+    """Lowest matching item index per query, or -1 when nothing matches."""
+    first = np.full(num_queries, np.iinfo(np.int64).max)
+    np.minimum.at(first, queries[hit], items[hit])
+    return np.where(first == np.iinfo(np.int64).max, -1, first)
+
+
+class VectorGame(Game):
+    """Game with no player whose robots, orbs and bolts are updated as arrays.
+    
+    Level setup, fruit and robot spawning and level changes are inherited
+    from Game. The enemies, orbs and bolts lists stay empty; the live
+    entities are in robots, orb_data and bolt_data.
+    """
+    
+    def __init__(self, difficulty=DEFAULT, seed=None):
+        self.robots = EntityArrays(x=np.int64, y=np.int64, vel_y=np.int64, height=np.int64,
+                                   direction_x=np.int64, speed=np.int64, type=np.int64,
+                                   change_dir_timer=np.int64, fire_timer=np.int64)
+        self.orb_data = EntityArrays(x=np.int64, y=np.int64, direction_x=np.int64, timer=np.int64,
+                                     blown_frames=np.int64, floating=np.bool_)
+        self.bolt_data = EntityArrays(x=np.int64, y=np.int64, direction_x=np.int64)
+        super().__init__(player=None, difficulty=difficulty, seed=seed)
+    
+    def setup_level(self):
+        super().setup_level()
+        self.robots.clear()
+        self.orb_data.clear()
+        self.bolt_data.clear()
+    
+    def add_robot(self, pos, type):
+        """Add a robot, drawing its speed as Robot() does."""
+        self.robots.extend(x=pos[0], y=pos[1], vel_y=0, height=BLANK.height,
+                           direction_x=1, speed=self.rng.randint(1, 3), type=type,
+                           change_dir_timer=0, fire_timer=100)
+    
+    def add_orb(self, pos, dir_x):
+        self.orb_data.extend(x=pos[0], y=pos[1], direction_x=dir_x, timer=-1,
+                             blown_frames=6, floating=False)
+    
+    def add_bolt(self, pos, dir_x):
+        self.bolt_data.extend(x=pos[0], y=pos[1], direction_x=dir_x)
+    
+    def update(self, input_state=None):
+        """Advance one tick, as Game.update does without a player."""
+        self.timer += 1
+        tables = level_tables(self.level_map)
+        
+        self._update_robots(tables)
+        self._update_orbs(tables)
+        self._update_bolts(tables)
+        for obj in self.pops:
+            obj.update(self)
+        for obj in self.fruits:
+            obj.update(self)
+        
+        # Remove inactive objects
+        self.entities.compact()
+        timer, y = self.orb_data.columns("timer", "y")
+        self.orb_data.keep((timer < Orb.MAX_TIMER) & (y > -40))
+        
+        # Every 100 frames, create random fruit
+        if self.timer % 100 == 0 and self.entities.enemies_remaining() + self.robots.count > 0:
+            pos = (self.rng.randint(70, 730), self.rng.randint(75, 400))
+            self.entities.spawn_fruit(pos, self.rng)
+        
+        # Every 81 frames, spawn enemy if possible
+        if (self.timer % 81 == 0 and len(self.pending_enemies) > 0
+                and self.robots.count < self.max_enemies()):
+            robot_type = self.pending_enemies.pop()
+            self.add_robot((self.get_robot_spawn_x(), -30), robot_type)
+        
+        # Check for level completion; nothing can trap a robot without a player
+        if self.robots.count == 0 and self.entities.level_clear():
+            self.next_level()
+    
+    def _update_robots(self, tables):
+        robots = self.robots
+        if robots.count == 0:
+            return
+        x, y, vel_y, height, direction_x, speed, type, change_dir_timer, fire_timer = robots.columns(
+            "x", "y", "vel_y", "height", "direction_x", "speed", "type", "change_dir_timer", "fire_timer")
+        
+        # Gravity; robots never move up, so they always fall by vel_y
+        np.minimum(vel_y + 1, GravityActor.MAX_FALL_SPEED, out=vel_y)
+        steps, landed = tables.sweep_down(x, y, vel_y)
+        y += steps
+        vel_y[landed] = 0
+        y[y - height >= HEIGHT] = 1
+        
+        change_dir_timer -= 1
+        fire_timer += 1
+        
+        steps, blocked = tables.sweep_across(x, y, direction_x, speed)
+        x += direction_x * steps
+        change_dir_timer[blocked] = 0
+        
+        # Aggressive robots turn towards an orb level with them, using the
+        # orbs as they were at the start of the tick
+        targeting = np.flatnonzero((type == Robot.TYPE_AGGRESSIVE) & (fire_timer >= 24))
+        target_dir = None
+        if targeting.size and self.orb_data.count:
+            orb_x, orb_y = self.orb_data.columns("x", "y")
+            rx, top = x[targeting], y[targeting] - height[targeting]
+            robot_cells = _cell_span(rx - 200, rx + 200) + _cell_span(top, y[targeting])
+            orb_cells = _cell_span(orb_x, orb_x) + _cell_span(orb_y, orb_y)
+            queries, items = _candidate_pairs(robot_cells, orb_cells)
+            hit = ((orb_y[items] >= top[queries]) & (orb_y[items] < y[targeting][queries])
+                   & (np.abs(orb_x[items] - rx[queries]) < 200))
+            first = _first_match(len(targeting), queries, items, hit)
+            found = first >= 0
+            targeting = targeting[found]
+            target_dir = np.where(orb_x[first[found]] - x[targeting] < 0, -1, 1)
+            fire_timer[targeting] = 0
+        
+        # Random draws, robot by robot in list order as Robot.update makes them
+        turning = change_dir_timer <= 0
+        firing = fire_timer >= 12
+        drawing = np.flatnonzero(turning | firing)
+        if drawing.size:
+            rng = self.rng
+            fire_probability = self.difficulty.robot_fire_probability(self.level)
+            new_dirs, new_timers, fired = [], [], []
+            for turns, fires in zip(turning[drawing].tolist(), firing[drawing].tolist()):
+                if turns:
+                    new_dirs.append(rng.choice(ROBOT_DIRECTIONS))
+                    new_timers.append(rng.randint(100, 250))
+                if fires:
+                    fired.append(rng.random() < fire_probability)
+            direction_x[turning] = new_dirs
+            change_dir_timer[turning] = new_timers
+            fire_timer[np.flatnonzero(firing)[np.array(fired, bool)]] = 0
+        if target_dir is not None:
+            direction_x[targeting] = target_dir
+        
+        shooting = ~firing & (fire_timer == 8)
+        if shooting.any():
+            self.bolt_data.extend(x=x[shooting] + direction_x[shooting] * 20, y=y[shooting] - 38,
+                                  direction_x=direction_x[shooting])
+        
+        height[:] = ROBOT_HEIGHT
+    
+    def _update_orbs(self, tables):
+        orbs = self.orb_data
+        if orbs.count == 0:
+            return
+        x, y, direction_x, timer, blown_frames, floating = orbs.columns(
+            "x", "y", "direction_x", "timer", "blown_frames", "floating")
+        timer += 1
+        
+        # Floating orbs rise 1 or 2 pixels, drawn orb by orb in list order
+        rising = np.flatnonzero(floating)
+        if rising.size:
+            randint = self.rng.randint
+            speed = np.array([randint(1, 2) for _ in range(rising.size)])
+            steps, _ = tables.sweep_up(x[rising], speed)
+            y[rising] -= steps
+        
+        blown = np.flatnonzero(~floating)
+        if blown.size:
+            steps, blocked = tables.sweep_across(x[blown], y[blown], direction_x[blown], 4)
+            x[blown] += direction_x[blown] * steps
+            floating[blown[blocked]] = True
+        
+        settled = timer == blown_frames
+        floating[settled] = True
+        popping = np.flatnonzero(~settled & ((timer >= Orb.MAX_TIMER) | (y <= -40)))
+        for px, py in zip(x[popping].tolist(), y[popping].tolist()):
+            self.entities.spawn_pop((px, py), 1)
+    
+    def _update_bolts(self, tables):
+        bolts = self.bolt_data
+        if bolts.count == 0:
+            return
+        x, y, direction_x = bolts.columns("x", "y", "direction_x")
+        steps, blocked = tables.sweep_across(x, y, direction_x, Bolt.SPEED)
+        x += direction_x * steps
+        active = ~blocked
+        
+        # Each bolt that is still flying hits the first orb containing it
+        flying = np.flatnonzero(active)
+        if flying.size and self.orb_data.count:
+            orb_x, orb_y, orb_timer = self.orb_data.columns("x", "y", "timer")
+            width = ORB_WIDTH[np.minimum(orb_timer, Orb.MAX_TIMER)]
+            height = ORB_HEIGHT[np.minimum(orb_timer, Orb.MAX_TIMER)]
+            left = orb_x - width * 0.5
+            top = orb_y - height * 0.5
+            bx, by = x[flying], y[flying]
+            bolt_cells = _cell_span(bx, bx) + _cell_span(by, by)
+            orb_cells = _cell_span(left, left + width) + _cell_span(top, top + height)
+            queries, items = _candidate_pairs(bolt_cells, orb_cells)
+            hit = ((left[items] <= bx[queries]) & (bx[queries] < left[items] + width[items])
+                   & (top[items] <= by[queries]) & (by[queries] < top[items] + height[items]))
+            first = _first_match(flying.size, queries, items, hit)
+            orb_timer[first[first >= 0]] = Orb.MAX_TIMER - 1
+            active[flying[first >= 0]] = False
+        
+        bolts.keep(active)
+    
+    def state(self):
+        """Comparable state, in the same form as game_state() gives for a Game."""
+        return (self.timer, self.level, self.rng.getstate(),
+                self.robots.rows("x", "y", "direction_x", "speed", "vel_y",
+                                 "change_dir_timer", "fire_timer", "type"),
+                self.orb_data.rows("x", "y", "direction_x", "timer", "floating"),
+                self.bolt_data.rows("x", "y", "direction_x"),
+                _scalar_rows(self.fruits, self.pops))
+
+
+def _scalar_rows(fruits, pops):
+    return ([(f.x, f.y, f.type, f.timer) for f in fruits],
+            [(p.x, p.y, p.type, p.timer) for p in pops])
+
+
+def game_state(game):
+    """State of a player-less Game in the form VectorGame.state() returns."""
+    return (game.timer, game.level, game.rng.getstate(),
+            [(r.x, r.y, r.direction_x, r.speed, r.vel_y, r.change_dir_timer, r.fire_timer, r.type)
+             for r in game.enemies],
+            [(o.x, o.y, o.direction_x, o.timer, o.floating) for o in game.orbs],
+            [(b.x, b.y, b.direction_x) for b in game.bolts],
+            _scalar_rows(game.fruits, game.pops))
+
+
+def populate(game, entities, seed):
+    """Fill a Game or VectorGame with robots, orbs and bolts.
+    
+    Half the entities are robots and a quarter each are orbs and bolts, at
+    positions drawn from their own generator so both engines get the same
+    layout.
+    """
+    layout = random.Random(seed)
+    vector = isinstance(game, VectorGame)
+    for i in range(entities):
+        kind = i % 4
+        pos = (layout.randint(MIN_X, MAX_X), layout.randint(0, 440))
+        if kind < 2:
+            robot_type = layout.randint(0, 1)
+            if vector:
+                game.add_robot(pos, robot_type)
+            else:
+                game.entities.spawn_robot(pos, robot_type, game.rng)
+        else:
+            dir_x = layout.choice(ROBOT_DIRECTIONS)
+            if kind == 2:
+                if vector:
+                    game.add_orb(pos, dir_x)
+                else:
+                    game.entities.spawn_orb(pos, dir_x)
+            elif vector:
+                game.add_bolt(pos, dir_x)
+            else:
+                game.entities.spawn_bolt(pos, dir_x)
+
+
+def benchmark(entities, frames, seed, check=True):
+    """Time both engines on the same populated game.
+    
+    Returns:
+        Tuple of (scalar seconds per frame, vector seconds per frame,
+        whether every frame matched, or None when not checked)
+    """
+    scalar, vector = Game(seed=seed), VectorGame(seed=seed)
+    populate(scalar, entities, seed)
+    populate(vector, entities, seed)
+    
+    scalar_time = vector_time = 0.0
+    matched = True if check else None
+    for _ in range(frames):
+        start = time.perf_counter()
+        scalar.update(None)
+        scalar_time += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        vector.update(None)
+        vector_time += time.perf_counter() - start
+        
+        if check and matched and game_state(scalar) != vector.state():
+            matched = False
+    return scalar_time / frames, vector_time / frames, matched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the scalar and NumPy entity engines.")
+    parser.add_argument("--entities", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="entity counts to benchmark")
+    parser.add_argument("--frames", type=int, default=60, help="ticks to run at each count")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the games and the layout")
+    parser.add_argument("--no-check", action="store_true", help="skip comparing state every tick")
+    args = parser.parse_args(argv)
+    
+    print(f"{'entities':>9} {'scalar ms':>10} {'vector ms':>10} {'speedup':>8}  match")
+    for entities in args.entities:
+        scalar, vector, matched = benchmark(entities, args.frames, args.seed, not args.no_check)
+        match = "-" if matched is None else ("yes" if matched else "NO")
+        print(f"{entities:>9} {scalar * 1000:>10.3f} {vector * 1000:>10.3f} {scalar / vector:>7.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
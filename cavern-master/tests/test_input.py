@@ -0,0 +1,122 @@
+"""Event-driven input: press edges between frames and across fixed-timestep ticks."""
+import os
+
+import pygame
+import pytest
+
+from src.input import EventInputManager, InputManager
+from src.profiler import Profiler
+
+FIRE, JUMP, LEFT = pygame.K_SPACE, pygame.K_UP, pygame.K_LEFT
+
+
+def test_tap_between_frames_gives_one_press():
+    manager = EventInputManager()
+    manager.key_down(FIRE, 1.0)
+    manager.key_up(FIRE, 1.01)
+    state = manager.capture_input()
+    assert state.fire_pressed and state.menu_start
+    # Seen as held for the tick that acts on it, like a polled press
+    assert state.fire_held
+    state = manager.capture_input()
+    assert not (state.fire_pressed or state.fire_held)
+
+
+def test_polling_misses_tap_between_frames():
+    class Keys:
+        space = up = p = left = right = f3 = False
+    
+    # Down and back up before the frame polls: nothing to see
+    assert not InputManager().capture_input(Keys()).fire_pressed
+
+
+def test_held_key_presses_once():
+    manager = EventInputManager()
+    manager.key_down(JUMP, 1.0)
+    states = [manager.capture_input() for _ in range(5)]
+    # A repeated key down while held is not a new press
+    manager.key_down(JUMP, 1.1)
+    states.append(manager.capture_input())
+    assert [state.jump_pressed for state in states] == [True, False, False, False, False, False]
+    manager.key_up(JUMP, 1.2)
+    manager.key_down(JUMP, 1.3)
+    assert manager.capture_input().jump_pressed
+
+
+def test_tapped_direction_moves_for_one_capture():
+    manager = EventInputManager()
+    manager.key_down(LEFT, 1.0)
+    manager.key_up(LEFT, 1.01)
+    assert manager.capture_input().left
+    assert not manager.capture_input().left
+
+
+def test_unknown_keys_are_ignored():
+    manager = EventInputManager()
+    manager.key_down(pygame.K_q, 1.0)
+    manager.key_up(pygame.K_q, 1.0)
+    assert manager.capture_input() == EventInputManager().capture_input()
+
+
+def test_latency_recorded_when_consumed():
+    manager = EventInputManager()
+    profiler = Profiler()
+    manager.key_down(FIRE, 1.0)
+    manager.capture_input()
+    assert manager.latency["fire"].total == 0
+    manager.consumed(1.005, profiler)
+    assert manager.latency["fire"].total == 1
+    assert manager.latency["fire"].counts[3] == 1   # 4 to 8 ms
+    assert profiler.sections["input.fire"].count == 1
+    # Each press is only recorded once
+    manager.consumed(1.5, profiler)
+    assert manager.latency["fire"].total == 1
+
+
+class RecordingScreen:
+    """Screen that keeps the InputState of every tick."""
+    
+    def __init__(self):
+        self.inputs = []
+    
+    def on_enter(self):
+        pass
+    
+    def update(self, input_state):
+        self.inputs.append(input_state)
+
+
+@pytest.fixture
+def app():
+    # The app's renderer loads sprites, which needs a display mode; the
+    # dummy driver gives one without a window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pgzero.loaders
+    from src.app import App
+    from src.render.atlas import GAME_DIR
+    pgzero.loaders.set_root(GAME_DIR)
+    pygame.display.init()
+    pygame.display.set_mode((800, 480))
+    app = App(None, None, None, input_manager=EventInputManager())
+    app.change_screen(RecordingScreen())
+    return app
+
+
+def test_press_fires_on_first_tick_of_multi_tick_frame(app):
+    app.input_manager.key_down(FIRE)
+    app.input_manager.key_up(FIRE)
+    app.update(app.tick_time * 3)
+    assert [state.fire_pressed for state in app.current_screen.inputs] == [True, False, False]
+    assert app.input_manager.latency["fire"].total == 1
+
+
+def test_press_on_frame_without_tick_waits_for_next_tick(app):
+    app.input_manager.key_down(JUMP)
+    app.input_manager.key_up(JUMP)
+    app.update(app.tick_time * 0.4)
+    assert app.current_screen.inputs == []
+    assert app.input_manager.latency["jump"].total == 0
+    app.update(app.tick_time * 0.4)
+    app.update(app.tick_time * 1.4)
+    assert [state.jump_pressed for state in app.current_screen.inputs] == [True, False]
+    assert app.input_manager.latency["jump"].total == 1
@@ -0,0 +1,113 @@
+"""CompiledLevel.sweep against the per-pixel movement loop it replaced."""
+import os
+
+import pytest
+
+from src.entities.base import CollideActor
+from src.entities.player import Player
+from src.game import Game
+from src.headless import RandomPolicy, run
+from src.level import GRID_BLOCK_SIZE, LEVEL_X_OFFSET, MAX_X, MIN_X, NUM_COLUMNS, NUM_ROWS, compile_level
+from src.levelpack import default_pack, load_pack, resolve_path
+from src.replay import DECODED_INPUTS, Recorder, Recording, replay, state_hash
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+SPEEDS = [0, 1, 4, 10]
+
+
+def block(game_grid, x, y):
+    """Check if there's a level grid block at these coordinates.
+    
+    The check the game made on every pixel of a move before levels were
+    compiled, kept here as the reference sweep() must agree with.
+    """
+    grid_x = (x - LEVEL_X_OFFSET) // GRID_BLOCK_SIZE
+    grid_y = y // GRID_BLOCK_SIZE
+    if grid_y > 0 and grid_y < NUM_ROWS:
+        row = game_grid[grid_y]
+        return grid_x >= 0 and grid_x < NUM_COLUMNS and len(row) > 0 and row[grid_x] != " "
+    else:
+        return False
+
+
+def pixel_sweep(grid, x, y, dx, dy, speed):
+    """The loop CollideActor.move ran before levels were compiled."""
+    for i in range(speed):
+        x, y = x + dx, y + dy
+        if x < MIN_X or x > MAX_X:
+            return i, True
+        if ((dy > 0 and y % GRID_BLOCK_SIZE == 0 or
+             dx > 0 and x % GRID_BLOCK_SIZE == 0 or
+             dx < 0 and x % GRID_BLOCK_SIZE == GRID_BLOCK_SIZE-1)
+            and block(grid, x, y)):
+                return i, True
+    return speed, False
+
+
+@pytest.mark.parametrize("index", range(len(default_pack())))
+@pytest.mark.parametrize("dx, dy", DIRECTIONS)
+def test_sweep_matches_pixel_loop(index, dx, dy):
+    grid = default_pack().level(index).grid
+    level_map = compile_level(grid)
+    mismatches = [(x, y, speed)
+                  for x in range(MIN_X - 20, MAX_X + 20)
+                  for y in range(-60, 500, 7)
+                  for speed in SPEEDS
+                  if level_map.sweep(x, y, dx, dy, speed) != pixel_sweep(grid, x, y, dx, dy, speed)]
+    assert mismatches == []
+
+
+def play(recording, monkeypatch=None):
+    """State hash after every tick of a recording, moving a pixel at a time if monkeypatch is given."""
+    game = Game(player=Player(), difficulty=recording.difficulty, seed=recording.seed,
+                level_pack=load_pack(resolve_path(recording.levels)))
+    if monkeypatch:
+        def pixel_move(actor, dx, dy, speed, level_map):
+            # The old CollideActor.move, stepping against the game's grid
+            new_x, new_y = int(actor.x), int(actor.y)
+            for i in range(speed):
+                new_x, new_y = new_x + dx, new_y + dy
+                if new_x < MIN_X or new_x > MAX_X:
+                    return True
+                if ((dy > 0 and new_y % GRID_BLOCK_SIZE == 0 or
+                     dx > 0 and new_x % GRID_BLOCK_SIZE == 0 or
+                     dx < 0 and new_x % GRID_BLOCK_SIZE == GRID_BLOCK_SIZE-1)
+                    and block(game.grid, new_x, new_y)):
+                        return True
+                actor.pos = new_x, new_y
+            return False
+        
+        monkeypatch.setattr(CollideActor, "move", pixel_move)
+    hashes = []
+    for code in recording.inputs:
+        game.update(DECODED_INPUTS[code])
+        hashes.append(state_hash(game))
+    return hashes
+
+
+def recorded_session(source):
+    """The checked-in recording, or the first game of a fresh headless run from a seed."""
+    if isinstance(source, str):
+        return Recording.load(os.path.join(DATA_DIR, source))
+    recorder = Recorder()
+    run(3000, RandomPolicy(source), source, recorder=recorder)
+    return recorder.recording()
+
+
+@pytest.mark.parametrize("source", ["random-seed2.rec", 1, 5])
+def test_recorded_runs_match_pixel_stepping(source, monkeypatch):
+    recording = recorded_session(source)
+    swept = play(recording)
+    assert swept == list(recording.hashes)
+    stepped = play(recording, monkeypatch)
+    mismatches = [tick for tick, (a, b) in enumerate(zip(swept, stepped)) if a != b]
+    assert mismatches == []
+
+
+def test_recording_replays():
+    recording = Recording.load(os.path.join(DATA_DIR, "random-seed2.rec"))
+    result = replay(recording)
+    assert result.mismatch is None
+    assert result.frames == recording.frames
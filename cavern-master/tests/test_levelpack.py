@@ -0,0 +1,127 @@
+"""Text and binary level packs, and the cache of compiled text packs."""
+import os
+
+import pytest
+
+from src.level import NUM_ROWS
+from src.levelpack import DEFAULT_PACK, TEXT_ROWS, LevelPack, compile_pack, load_pack, parse_pack
+
+EMPTY_ROW = "." * 28
+WALL_ROW = "X" * 28
+
+
+def text_levels(text):
+    """(settings, rows) of each level, read straight from the text."""
+    levels = []
+    for line in text.splitlines():
+        words = line.split()
+        if not words or words[0].startswith("#"):
+            continue
+        if words == ["level"]:
+            levels.append(({}, []))
+        elif len(words) == 2:
+            levels[-1][0][words[0]] = int(words[1])
+        else:
+            levels[-1][1].append(words[0])
+    return levels
+
+
+def pack_text(*settings):
+    """A pack of walled levels, one per dict of settings."""
+    text = ""
+    for level in settings:
+        text += "level\n" + "".join(f"{name} {value}\n" for name, value in level.items())
+        text += "\n".join([WALL_ROW] + [EMPTY_ROW] * (TEXT_ROWS - 1)) + "\n"
+    return text
+
+
+def round_trip(text, tmp_path):
+    path = str(tmp_path / "pack.lvl")
+    compile_pack(parse_pack(text), path)
+    return LevelPack(path)
+
+
+def check_pack(pack, text):
+    expected = text_levels(text)
+    assert len(pack) == len(expected)
+    for index, (settings, rows) in enumerate(expected):
+        info = pack.level(index)
+        assert len(info.grid) == NUM_ROWS
+        assert list(info.grid) == [row.replace(".", " ") for row in rows + rows[:1]]
+        assert info.enemies == settings.get("enemies")
+        assert info.aggressive == settings.get("aggressive")
+        assert info.colour == settings.get("colour")
+
+
+def test_classic_round_trip(tmp_path):
+    with open(DEFAULT_PACK) as f:
+        text = f.read()
+    pack = round_trip(text, tmp_path)
+    check_pack(pack, text)
+    pack.close()
+
+
+def test_settings_round_trip(tmp_path):
+    text = pack_text({}, {"enemies": 12, "aggressive": 0, "colour": 3}, {"colour": 1})
+    pack = round_trip(text, tmp_path)
+    check_pack(pack, text)
+    pack.close()
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    EMPTY_ROW,
+    "level\n" + EMPTY_ROW,
+    pack_text({}) + EMPTY_ROW,
+    pack_text({}).replace(EMPTY_ROW, "..X..", 1),
+    pack_text({"colour": 4}),
+    pack_text({"enemies": 0}),
+    pack_text({}).replace(WALL_ROW, "speed 3\n" + WALL_ROW),
+])
+def test_malformed_text_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse_pack(text)
+
+
+def test_malformed_binary_is_rejected(tmp_path):
+    path = str(tmp_path / "pack.lvl")
+    compile_pack(parse_pack(pack_text({}, {})), path)
+    with open(path, "rb") as f:
+        data = f.read()
+    for bad in (b"", b"CAVLVL", b"NOTLVL" + data[6:], data[:-1]):
+        with open(path, "wb") as f:
+            f.write(bad)
+        with pytest.raises(ValueError):
+            LevelPack(path)
+
+
+def test_cache_reused_until_text_changes(tmp_path):
+    source = tmp_path / "mine.txt"
+    source.write_text(pack_text({"enemies": 5}))
+    cache_dir = str(tmp_path / "cache")
+    
+    load_pack(str(source), cache_dir).close()
+    first, = os.listdir(cache_dir)
+    compiled_mtime = os.stat(os.path.join(cache_dir, first)).st_mtime_ns
+    load_pack(str(source), cache_dir).close()
+    assert os.listdir(cache_dir) == [first]
+    assert os.stat(os.path.join(cache_dir, first)).st_mtime_ns == compiled_mtime
+    
+    # A new modification time invalidates the cached copy and replaces it
+    source.write_text(pack_text({"enemies": 9}))
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    pack = load_pack(str(source), cache_dir)
+    assert pack.level(0).enemies == 9
+    pack.close()
+    second, = os.listdir(cache_dir)
+    assert second != first
+
+
+def test_same_name_packs_keep_their_caches(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "classic.txt").write_text(pack_text({"colour": 2}))
+        load_pack(str(tmp_path / directory / "classic.txt"), cache_dir).close()
+    assert len(os.listdir(cache_dir)) == 2
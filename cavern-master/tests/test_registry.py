@@ -0,0 +1,52 @@
+"""EntityRegistry's running counts against counts taken from its lists."""
+import random
+
+import pytest
+
+from src.entities.player import Player
+from src.game import Game
+from src.headless import KeyState, RandomPolicy
+from src.input import InputManager
+
+TICKS = 3000
+
+
+def check_counts(entities):
+    assert entities.trapped_orbs == sum(orb.trapped_enemy_type is not None for orb in entities.orbs)
+    assert entities.orb_pool.live == len(entities.orbs)
+    assert entities.bolt_pool.live == len(entities.bolts)
+    assert entities.pop_pool.live == len(entities.pops)
+    assert entities.fruit_pool.live == len(entities.fruits)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 5])
+def test_counts_match_lists_every_tick(seed):
+    game = Game(player=Player(), seed=seed)
+    entities = game.entities
+    policy = RandomPolicy(seed)
+    traps = random.Random(seed)
+    keys = KeyState()
+    input_manager = InputManager()
+    for frame in range(TICKS):
+        policy(frame, keys)
+        game.update(input_manager.capture_input(keys))
+        if game.player.lives < 0:
+            break
+        check_counts(entities)
+        # Trap enemies in some orbs, so trapped orbs are counted as they
+        # pop, expire and are recycled
+        for orb in entities.orbs:
+            if orb.trapped_enemy_type is None and traps.random() < 0.05:
+                entities.trap(orb, traps.randint(0, 1))
+        check_counts(entities)
+    assert frame > 100
+
+
+def test_trapped_enemy_type_is_read_only():
+    game = Game(player=Player(), seed=1)
+    orb = game.entities.spawn_orb((400, 200), 1)
+    with pytest.raises(AttributeError):
+        orb.trapped_enemy_type = 0
+    game.entities.trap(orb, 1)
+    assert orb.trapped_enemy_type == 1
+    assert game.entities.trapped_orbs == 1
@@ -0,0 +1,31 @@
+"""Recording a game and replaying it with every state hash checked."""
+from src.headless import RandomPolicy, run
+from src.replay import Recorder, Recording, replay
+
+
+def record(tmp_path, seed, frames=3000):
+    recorder = Recorder(str(tmp_path / "session.rec"))
+    run(frames, RandomPolicy(seed), seed, recorder=recorder)
+    recorder.save()
+    return recorder
+
+
+def test_recorded_session_replays(tmp_path):
+    recorder = record(tmp_path, 2)
+    recording = Recording.load(recorder.path)
+    assert recording.frames == len(recorder.inputs) > 0
+    assert list(recording.hashes) == list(recorder.hashes)
+    result = replay(recording)
+    assert result.mismatch is None
+    assert result.frames == recording.frames
+
+
+def test_replay_reports_divergence(tmp_path):
+    recording = Recording.load(record(tmp_path, 5).path)
+    recording.hashes[100] ^= 1
+    assert replay(recording).mismatch == 100
+
+
+def test_recording_names_pack_relative_to_game(tmp_path):
+    recording = Recording.load(record(tmp_path, 1, frames=10).path)
+    assert recording.levels == "levels/classic.txt"
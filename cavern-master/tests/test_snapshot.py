@@ -0,0 +1,69 @@
+"""Snapshots restoring a game so that it plays on identically."""
+import pytest
+
+from src.entities.player import Player
+from src.game import Game
+from src.headless import KeyState, RandomPolicy
+from src.input import InputManager
+from src.replay import state_hash
+from src.snapshot import SnapshotRing, capture, restore
+
+FRAMES = 1500
+
+
+def reference_run(seed):
+    """The inputs and state hash of every tick of an unsnapshotted game."""
+    game = Game(player=Player(), seed=seed)
+    policy = RandomPolicy(seed)
+    keys = KeyState()
+    input_manager = InputManager()
+    inputs, hashes = [], []
+    for frame in range(FRAMES):
+        policy(frame, keys)
+        input_state = input_manager.capture_input(keys)
+        game.update(input_state)
+        if game.player.lives < 0:
+            break
+        inputs.append(input_state)
+        hashes.append(state_hash(game))
+    return inputs, hashes
+
+
+@pytest.mark.parametrize("seed", [1, 2, 5])
+def test_restore_every_tick(seed):
+    inputs, hashes = reference_run(seed)
+    game = Game(player=Player(), seed=seed)
+    for frame, input_state in enumerate(inputs):
+        game.update(input_state)
+        restore(game, capture(game))
+        assert state_hash(game) == hashes[frame], f"diverged at tick {frame}"
+
+
+@pytest.mark.parametrize("seed", [1, 2, 5])
+def test_rewind_replays_identically(seed):
+    inputs, hashes = reference_run(seed)
+    game = Game(player=Player(), seed=seed)
+    ring = SnapshotRing()
+    for input_state in inputs:
+        game.update(input_state)
+        ring.push(game)
+    
+    rewound = ring.rewind(game, 120)
+    assert rewound == 120
+    start = len(inputs) - rewound
+    assert state_hash(game) == hashes[start - 1]
+    for frame in range(start, len(inputs)):
+        game.update(inputs[frame])
+        assert state_hash(game) == hashes[frame], f"diverged at tick {frame}"
+
+
+def test_rewind_is_limited_to_history():
+    inputs, _ = reference_run(1)
+    game = Game(player=Player(), seed=1)
+    ring = SnapshotRing(capacity=10)
+    for input_state in inputs[:50]:
+        game.update(input_state)
+        ring.push(game)
+    assert len(ring) == 10
+    assert ring.rewind(game, 100) == 9
+    assert len(ring) == 1
@@ -0,0 +1,83 @@
+"""SpatialHash queries against a brute-force scan of the same actors."""
+import random
+
+import pytest
+
+from src.spatial import LINEAR_LIMIT, SpatialHash
+
+
+class Box:
+    """Just the parts of an actor SpatialHash reads."""
+    
+    def __init__(self, left, top, width, height):
+        self.topleft = (left, top)
+        self.width = width
+        self.height = height
+    
+    def overlaps(self, left, top, right, bottom):
+        x, y = self.topleft
+        return x <= right and x + self.width >= left and y <= bottom and y + self.height >= top
+
+
+def random_box(rng):
+    return Box(rng.randint(-50, 800), rng.randint(-60, 480), rng.randint(1, 60), rng.randint(1, 60))
+
+
+def check_order(result, objs):
+    """Result holds actors of objs once each, in list order."""
+    indices = [objs.index(obj) for obj in result]
+    assert indices == sorted(set(indices))
+
+
+@pytest.mark.parametrize("count", [0, 1, LINEAR_LIMIT, LINEAR_LIMIT + 1, 50, 300])
+def test_queries_match_brute_force(count):
+    rng = random.Random(count)
+    objs = [random_box(rng) for _ in range(count)]
+    grid = SpatialHash(objs)
+    for _ in range(200):
+        left, top = rng.randint(-100, 800), rng.randint(-100, 500)
+        right, bottom = left + rng.randint(0, 400), top + rng.randint(0, 100)
+        result = list(grid.query_rect(left, top, right, bottom))
+        check_order(result, objs)
+        # Candidates may include near misses, but never leave out a hit
+        assert [obj for obj in objs if obj.overlaps(left, top, right, bottom)] == \
+            [obj for obj in result if obj.overlaps(left, top, right, bottom)]
+        
+        x, y = rng.randint(-50, 800), rng.randint(-60, 480)
+        result = list(grid.query_point(x, y))
+        check_order(result, objs)
+        assert [obj for obj in objs if obj.overlaps(x, y, x, y)] == \
+            [obj for obj in result if obj.overlaps(x, y, x, y)]
+
+
+@pytest.mark.parametrize("count", [LINEAR_LIMIT, 100])
+def test_rebuilds_after_invalidate(count):
+    rng = random.Random(7)
+    objs = [random_box(rng) for _ in range(count)]
+    grid = SpatialHash(objs)
+    grid.query_rect(0, 0, 800, 480)
+    
+    # Move every actor, remove one and add some: only seen after invalidate()
+    for obj in objs:
+        obj.topleft = (rng.randint(-50, 800), rng.randint(-60, 480))
+    objs.pop(0)
+    objs.extend(random_box(rng) for _ in range(LINEAR_LIMIT + 1))
+    grid.invalidate()
+    for _ in range(100):
+        left, top = rng.randint(-100, 800), rng.randint(-100, 500)
+        right, bottom = left + rng.randint(0, 200), top + rng.randint(0, 200)
+        result = list(grid.query_rect(left, top, right, bottom))
+        check_order(result, objs)
+        assert [obj for obj in objs if obj.overlaps(left, top, right, bottom)] == \
+            [obj for obj in result if obj.overlaps(left, top, right, bottom)]
+
+
+def test_stale_until_invalidated():
+    objs = [Box(100 * i, 100, 10, 10) for i in range(LINEAR_LIMIT + 1)]
+    grid = SpatialHash(objs)
+    assert objs[0] in grid.query_point(5, 105)
+    objs[0].topleft = (700, 400)
+    assert objs[0] in grid.query_point(5, 105)
+    grid.invalidate()
+    assert objs[0] not in grid.query_point(5, 105)
+    assert objs[0] in grid.query_point(705, 405)
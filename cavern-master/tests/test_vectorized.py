@@ -0,0 +1,22 @@
+"""The NumPy engine against the scalar Game, tick for tick."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.game import Game
+from src.vectorized import VectorGame, game_state, populate
+
+TICKS = 300
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+@pytest.mark.parametrize("entities", [10, 200])
+def test_vector_engine_matches_scalar(entities, seed):
+    scalar, vector = Game(seed=seed), VectorGame(seed=seed)
+    populate(scalar, entities, seed)
+    populate(vector, entities, seed)
+    assert game_state(scalar) == vector.state()
+    for tick in range(TICKS):
+        scalar.update(None)
+        vector.update(None)
+        assert game_state(scalar) == vector.state(), f"diverged at tick {tick}"